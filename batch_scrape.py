@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Batch scraping across a fleet of clinics
+Runs many clinic scrapers concurrently and writes one scraper output per line (fleet JSONL)
+"""
+
+import argparse
+import json
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any
+
+from page_decode import MAX_BODY_BYTES
+from page_store import PageStore, new_run_id
+from recrawl_scheduler import TARGET_FRESHNESS, RecrawlScheduler
+from scraper_registry import clinic_keys, get_scraper_class
+from scraper_logging import configure_logging
+
+logger = logging.getLogger(__name__)
+
+
+def scrape_clinic(job: Dict[str, Any], **scraper_kwargs) -> Dict[str, Any]:
+    """Scrape one clinic and return its output with timing and failure details
+
+    job holds clinic_key and optionally base_url; scraper_kwargs go to the scraper constructor.
+    """
+    started = time.monotonic()
+    result = {"clinic_key": job["clinic_key"], "base_url": job.get("base_url"), "ok": False,
+              "error": None, "clinic_data": None}
+    try:
+        scraper_class = get_scraper_class(job["clinic_key"])
+        scraper = scraper_class(base_url=job.get("base_url"), **scraper_kwargs)
+        result["clinic_data"] = scraper.scrape_all_data()
+        result["ok"] = True
+    except Exception as e:
+        logger.error("Scraping %s (%s) failed: %s", job['clinic_key'], job.get('base_url'), e)
+        result["error"] = str(e)
+    result["seconds"] = time.monotonic() - started
+    return result
+
+
+def run_batch(jobs: List[Dict[str, Any]], workers: int = 8, output_path: Optional[str] = None,
+              **scraper_kwargs) -> List[Dict[str, Any]]:
+    """Scrape every job with a thread pool (the work is network-bound) and optionally write fleet JSONL"""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda job: scrape_clinic(job, **scraper_kwargs), jobs))
+
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for result in results:
+                if result["ok"]:
+                    # Tag each output with its job so same-clinic jobs on different sites stay apart
+                    record = {"clinic_key": result["clinic_key"]}
+                    if result["base_url"]:
+                        record["base_url"] = result["base_url"]
+                    record.update(result["clinic_data"])
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        logger.info("Fleet output saved to %s", output_path)
+    return results
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    """Main execution function"""
+    parser = argparse.ArgumentParser(prog=prog, description="Scrape a fleet of clinics concurrently")
+    parser.add_argument("--clinic", action="append", dest="clinics", metavar="KEY[=BASE_URL]",
+                        help="Clinic key, optionally with a base URL override, repeatable (default: all registered)")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent clinics")
+    parser.add_argument("--time-budget", type=float, default=None, help="Seconds allowed per clinic")
+    parser.add_argument("--hedge-percentile", type=float, default=None,
+                        help="Send a backup request once a fetch is slower than this latency percentile")
+    parser.add_argument("--store", default=None, help="Archive fetched pages into this page store")
+    parser.add_argument("--output", default="fleet_output.jsonl", help="Fleet JSONL output file")
+    parser.add_argument("--recrawl-state", default=None,
+                        help="Recrawl scheduler state; pages not yet due are served from --store")
+    parser.add_argument("--budget", type=float, default=100.0, help="Most page fetches per day for the recrawl plan")
+    parser.add_argument("--target-freshness", type=float, default=TARGET_FRESHNESS,
+                        help="Recrawl plan stops adding fetches to a page expected to be current this share of the time")
+    parser.add_argument("--max-body-bytes", type=int, default=MAX_BODY_BYTES,
+                        help="Truncate page bodies past this size before parsing")
+    parser.add_argument("--fetch-log-sample", type=float, default=0.1,
+                        help="Fraction of per-attempt fetch log lines to keep (warnings and errors are never sampled)")
+    args = parser.parse_args(argv)
+    configure_logging(sample_rates={"fetch": args.fetch_log_sample})
+
+    jobs = []
+    for spec in args.clinics or clinic_keys():
+        clinic_key, _, base_url = spec.partition("=")
+        jobs.append({"clinic_key": clinic_key, "base_url": base_url or None})
+
+    scraper_kwargs = {"time_budget": args.time_budget, "hedge_percentile": args.hedge_percentile,
+                      "max_body_bytes": args.max_body_bytes}
+    if args.store:
+        scraper_kwargs.update(page_store=PageStore(args.store), run_id=new_run_id())
+
+    scheduler = None
+    if args.recrawl_state:
+        scheduler = RecrawlScheduler(args.recrawl_state, budget_per_day=args.budget,
+                                     target_freshness=args.target_freshness)
+        scraper_kwargs["scheduler"] = scheduler
+
+    results = run_batch(jobs, args.workers, args.output, **scraper_kwargs)
+
+    if scheduler:
+        # Re-plan with this run's observations before the next run reads the state
+        scheduler.plan()
+        scheduler.save()
+
+    failed = [r for r in results if not r["ok"]]
+    print(f"\n=== BATCH SUMMARY ===")
+    print(f"Clinics: {len(results)}  Succeeded: {len(results) - len(failed)}  Failed: {len(failed)}")
+    for result in failed:
+        print(f"  - {result['clinic_key']} ({result['base_url']}): {result['error']}")
+
+
+if __name__ == "__main__":
+    main()
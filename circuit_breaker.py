@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Per-host circuit breaker for the clinic scrapers
+Stops fetches against a host that keeps failing so extractors fall back to defaults immediately
+"""
+
+import threading
+import time
+import logging
+from typing import Callable, Dict
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a cool-down before a single probe request"""
+
+    def __init__(self, host: str, failure_threshold: int = 3, cooldown: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.cooldown:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a request to this host may be attempted now"""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                # Let exactly one probe through after the cool-down
+                self._probe_in_flight = True
+                logger.info("Circuit half-open for %s, probing", self.host)
+                return True
+            return False
+
+    def record_success(self):
+        """Reset the failure count and close the circuit"""
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("Circuit closed for %s", self.host)
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """Count a failure and open the circuit once the threshold is reached"""
+        with self._lock:
+            self._consecutive_failures += 1
+            self._probe_in_flight = False
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning("Circuit opened for %s after %d consecutive failures",
+                                   self.host, self._consecutive_failures)
+                self._state = OPEN
+                self._opened_at = self._clock()
+
+    def release_probe(self):
+        """Give back a half-open probe whose request ended without a verdict on the host"""
+        with self._lock:
+            self._probe_in_flight = False
+
+
+class HostCircuitBreakers:
+    """Registry of circuit breakers keyed by URL host, shared across scraper instances"""
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def for_url(self, url: str) -> CircuitBreaker:
+        """Return the breaker for the host serving url, creating it on first use"""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(host, self.failure_threshold, self.cooldown, self._clock)
+                self._breakers[host] = breaker
+            return breaker
+
+    def open_hosts(self) -> Dict[str, str]:
+        """Return the hosts whose circuit is not closed, with their state"""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {b.host: b.state for b in breakers if b.state != CLOSED}
+
+
+def is_host_failure(error: Exception) -> bool:
+    """Whether a fetch error says the host is unhealthy (vs. a missing page)"""
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        # Connection errors, timeouts and the like
+        return True
+    return status >= 500 or status == 429
+
+
+# Shared by default so one dead clinic host trips once per process, not once per scraper
+default_breakers = HostCircuitBreakers()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Unified command line for the clinic scrapers
+Each subcommand imports its module only when it runs, so help, clinic listing and the light
+export commands never load requests or bs4
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import logging
+from typing import List, Optional
+
+from scraper_logging import configure_logging
+from scraper_registry import SCRAPERS, clinic_keys, get_scraper_class
+
+logger = logging.getLogger(__name__)
+
+# Subcommands handled by an existing module's main(argv, prog): command -> (module, help)
+DELEGATED = {
+    "batch": ("batch_scrape", "Scrape a fleet of clinics concurrently"),
+    "reextract": ("reextract", "Re-run extractors over an archived run"),
+    "bench": ("site_simulator", "Load test the scrapers against simulated sites"),
+    "export sql": ("delta_sql", "Generate delta SQL from scraper outputs"),
+    "export prompts": ("prompt_builder", "Render system prompts from scraper outputs"),
+}
+
+
+def scrape(args: argparse.Namespace) -> int:
+    """Scrape each requested clinic in turn and save <clinic_key>_data.json (or <job>_data.json)"""
+    from page_store import PageStore, new_run_id
+    from reextract import output_path
+
+    configure_logging()
+    scraper_kwargs = {"time_budget": args.time_budget, "hedge_percentile": args.hedge_percentile}
+    if args.store:
+        scraper_kwargs.update(page_store=PageStore(args.store), run_id=new_run_id())
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    failures = 0
+    for spec in args.clinics:
+        clinic_key, _, base_url = spec.partition("=")
+        try:
+            scraper = get_scraper_class(clinic_key)(base_url=base_url or None, **scraper_kwargs)
+            clinic_data = scraper.scrape_all_data()
+            scraper.save_to_json(output_path(args.output_dir, scraper.job_key))
+        except Exception as e:
+            logger.error("Scraping %s failed: %s", clinic_key, e)
+            failures += 1
+            continue
+
+        print(f"\n=== EXTRACTION SUMMARY ===")
+        print(f"Clinic: {clinic_data['clinic_name']}")
+        print(f"Overall Confidence: {clinic_data['overall_confidence']:.2%}")
+        print(f"Data Completeness: {clinic_data['data_completeness']:.2%}")
+        print(f"Identified Gaps: {len(clinic_data['identified_gaps'])}")
+        for gap in clinic_data['identified_gaps']:
+            print(f"  - {gap}")
+    return 1 if failures else 0
+
+
+def list_clinics(args: argparse.Namespace) -> int:
+    """Print registered clinic keys and their scraper classes without importing them"""
+    for clinic_key in clinic_keys():
+        print(f"{clinic_key}\t{SCRAPERS[clinic_key]}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Clinic scraper toolkit")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="COMMAND")
+
+    scrape_parser = commands.add_parser("scrape", help="Scrape one or more clinics")
+    scrape_parser.add_argument("clinics", nargs="+", metavar="KEY[=BASE_URL]",
+                               help="Registered clinic key, optionally with a base URL override")
+    scrape_parser.add_argument("--time-budget", type=float, default=None, help="Seconds allowed per clinic")
+    scrape_parser.add_argument("--hedge-percentile", type=float, default=None,
+                               help="Send a backup request once a fetch is slower than this latency percentile")
+    scrape_parser.add_argument("--store", default=None, help="Archive fetched pages into this page store")
+    scrape_parser.add_argument("--output-dir", default=".", help="Directory for <clinic_key>_data.json")
+    scrape_parser.set_defaults(handler=scrape)
+
+    clinics_parser = commands.add_parser("clinics", help="List registered clinics")
+    clinics_parser.set_defaults(handler=list_clinics)
+
+    # Listed for --help only; main() hands their arguments to the owning module before parsing
+    export_parser = commands.add_parser("export", help="Export scraper outputs")
+    export_formats = export_parser.add_subparsers(dest="format", required=True, metavar="FORMAT")
+    for command, (_, help_text) in DELEGATED.items():
+        group, _, name = command.rpartition(" ")
+        (export_formats if group == "export" else commands).add_parser(name, help=help_text)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main execution function"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = build_parser()
+
+    command = argv[:2] if argv[:1] == ["export"] else argv[:1]
+    delegated = DELEGATED.get(" ".join(command))
+    if delegated:
+        module = importlib.import_module(delegated[0])
+        module.main(argv[len(command):], prog=f"{parser.prog} {' '.join(command)}")
+        return 0
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
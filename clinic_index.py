@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Local BM25 retrieval index over scraped clinic pages
+Chunks the visible text of each archived page and builds a compact per-clinic inverted index
+with memory-mapped postings, for the hybrid RAG "local knowledge check"
+"""
+
+import argparse
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import logging
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Any, Tuple
+
+from page_decode import decode_body
+from page_store import PageStore
+from scraper_logging import configure_logging
+
+logger = logging.getLogger(__name__)
+
+CHUNK_WORDS = 120
+CHUNK_OVERLAP = 30
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from how i in is it my of on or our the this to we what
+when where which who will with you your
+""".split())
+NON_VISIBLE_TAGS = ["script", "style", "noscript", "template", "svg", "head"]
+
+# Each posting is (chunk id, term frequency) as two little-endian uint32s
+POSTING = struct.Struct("<II")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def visible_text(html: str) -> str:
+    """Text a visitor would see on the page"""
+    # bs4 is only needed to build indexes, not to query them
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(NON_VISIBLE_TAGS):
+        tag.decompose()
+    return " ".join(soup.get_text(" ").split())
+
+
+def chunk_text(text: str, size: int = CHUNK_WORDS, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """Split text into overlapping windows of roughly size words"""
+    words = text.split()
+    if not words:
+        return []
+    step = max(1, size - overlap)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + size]))
+        if start + size >= len(words):
+            break
+    return chunks
+
+
+def build_index(pages: Dict[str, str], index_dir: str):
+    """Write an index for one clinic from a url -> visible text mapping"""
+    chunks = []
+    term_postings: Dict[str, List[Tuple[int, int]]] = {}
+    doc_lengths = array("I")
+
+    for url, text in pages.items():
+        for chunk in chunk_text(text):
+            chunk_id = len(chunks)
+            chunks.append({"url": url, "text": chunk})
+            tokens = tokenize(chunk)
+            doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                term_postings.setdefault(term, []).append((chunk_id, tf))
+
+    os.makedirs(index_dir, exist_ok=True)
+    lexicon = {}
+    offset = 0
+    with open(os.path.join(index_dir, "postings.bin"), "wb") as f:
+        for term in sorted(term_postings):
+            postings = term_postings[term]
+            lexicon[term] = [offset, len(postings)]
+            for chunk_id, tf in postings:
+                f.write(POSTING.pack(chunk_id, tf))
+            offset += len(postings)
+
+    with open(os.path.join(index_dir, "doclens.bin"), "wb") as f:
+        doc_lengths.tofile(f)
+    with open(os.path.join(index_dir, "lexicon.json"), "w", encoding="utf-8") as f:
+        json.dump(lexicon, f, separators=(",", ":"))
+    with open(os.path.join(index_dir, "chunks.json"), "w", encoding="utf-8") as f:
+        json.dump(chunks, f, ensure_ascii=False)
+    logger.info("Indexed %d chunks, %d terms into %s", len(chunks), len(lexicon), index_dir)
+
+
+def build_index_from_run(store: PageStore, run_id: str, clinic_key: str, index_root: str = "clinic_index") -> str:
+    """Pipeline stage: index every archived page of one clinic in one run"""
+    pages = {}
+    for url, entry in store.load_index(run_id, clinic_key).items():
+        pages[url] = visible_text(decode_body(store.get(entry["sha256"]), entry.get("content_type")))
+    index_dir = os.path.join(index_root, clinic_key)
+    build_index(pages, index_dir)
+    return index_dir
+
+
+class ClinicIndex:
+    """Read-only BM25 index for one clinic, postings memory-mapped from disk"""
+
+    def __init__(self, index_dir: str, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        with open(os.path.join(index_dir, "lexicon.json"), encoding="utf-8") as f:
+            self.lexicon: Dict[str, List[int]] = json.load(f)
+        with open(os.path.join(index_dir, "chunks.json"), encoding="utf-8") as f:
+            self.chunks: List[Dict[str, str]] = json.load(f)
+        self.doc_lengths = array("I")
+        with open(os.path.join(index_dir, "doclens.bin"), "rb") as f:
+            self.doc_lengths.frombytes(f.read())
+
+        self.doc_count = len(self.doc_lengths)
+        self.avg_length = (sum(self.doc_lengths) / self.doc_count) if self.doc_count else 0.0
+        self._postings_file = open(os.path.join(index_dir, "postings.bin"), "rb")
+        size = os.fstat(self._postings_file.fileno()).st_size
+        # mmap refuses empty files; an index with no terms has nothing to search anyway
+        self._mmap = mmap.mmap(self._postings_file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._postings = memoryview(self._mmap) if self._mmap is not None else None
+
+    def close(self):
+        if self._mmap is not None:
+            self._postings.release()
+            self._mmap.close()
+        self._postings_file.close()
+
+    def _idf(self, df: int) -> float:
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Return the top-k chunks for query by BM25 score"""
+        if self._postings is None:
+            return []
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            entry = self.lexicon.get(term)
+            if entry is None:
+                continue
+            offset, df = entry
+            idf = self._idf(df)
+            start = offset * POSTING.size
+            for chunk_id, tf in POSTING.iter_unpack(self._postings[start:start + df * POSTING.size]):
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[chunk_id] / self.avg_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [dict(self.chunks[chunk_id], score=round(score, 4)) for chunk_id, score in best]
+
+
+class ClinicIndexes:
+    """Query API across clinics, keeping each opened index in memory"""
+
+    def __init__(self, index_root: str = "clinic_index"):
+        self.index_root = index_root
+        self._open: Dict[str, ClinicIndex] = {}
+
+    def get(self, clinic_key: str) -> ClinicIndex:
+        if clinic_key not in self._open:
+            self._open[clinic_key] = ClinicIndex(os.path.join(self.index_root, clinic_key))
+        return self._open[clinic_key]
+
+    def search(self, clinic_key: str, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        return self.get(clinic_key).search(query, k)
+
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Build or query per-clinic BM25 indexes")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="Index archived pages from a run")
+    build.add_argument("--store", default="page_store", help="Page store directory")
+    build.add_argument("--run", dest="run_id", help="Archived run id (default: latest)")
+    build.add_argument("--clinic", action="append", dest="clinics", help="Clinic key, repeatable (default: all in run)")
+    build.add_argument("--index-root", default="clinic_index", help="Directory for clinic indexes")
+
+    search = subparsers.add_parser("search", help="Query one clinic's index")
+    search.add_argument("--clinic", required=True, help="Clinic key")
+    search.add_argument("--index-root", default="clinic_index", help="Directory for clinic indexes")
+    search.add_argument("-k", type=int, default=5, help="Number of chunks to return")
+    search.add_argument("query", help="Patient question")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        store = PageStore(args.store)
+        run_id: Optional[str] = args.run_id or (store.list_runs() or [None])[-1]
+        if run_id is None:
+            parser.error(f"No archived runs in {args.store}")
+        for clinic_key in args.clinics or store.list_clinics(run_id):
+            build_index_from_run(store, run_id, clinic_key, args.index_root)
+    else:
+        for hit in ClinicIndexes(args.index_root).search(args.clinic, args.query, args.k):
+            print(f"[{hit['score']:.2f}] {hit['url']}\n    {hit['text'][:200]}")
+
+
+if __name__ == "__main__":
+    configure_logging()
+    main()
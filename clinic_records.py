@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Compact record types for scraped clinic data
+Slotted classes replace the nested dicts of a scraper output so large fleets fit in memory;
+repeated vocabulary strings are interned and unknown or misspelled fields raise errors
+"""
+
+import json
+import sys
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, json is always available
+    orjson = None
+
+
+def _intern_all(values: Optional[List[str]]) -> Optional[Tuple[str, ...]]:
+    if values is None:
+        return None
+    return tuple(sys.intern(v) for v in values)
+
+
+class Record:
+    """Base for slotted records built from and written back to scraper-output dicts
+
+    Subclasses list their fields in __slots__ (in output key order) and may declare
+    _vocab_fields (string lists stored as interned tuples), _vocab_maps (dicts whose
+    string values are interned) and _nested (field -> Record subclass).
+    """
+
+    __slots__ = ()
+    _vocab_fields: Tuple[str, ...] = ()
+    _vocab_maps: Tuple[str, ...] = ()
+    _nested: Dict[str, type] = {}
+
+    def __init__(self, **fields):
+        unknown = set(fields) - set(self.__slots__)
+        if unknown:
+            raise TypeError(f"{type(self).__name__} has no field(s): {', '.join(sorted(unknown))}")
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        fields = {}
+        for key, value in data.items():
+            if key in cls._vocab_fields:
+                value = _intern_all(value)
+            elif key in cls._vocab_maps and value is not None:
+                value = {k: sys.intern(v) if isinstance(v, str) else v for k, v in value.items()}
+            elif key in cls._nested and value is not None:
+                value = cls._nested[key].from_dict(value)
+            fields[key] = value
+        return cls(**fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if isinstance(value, Record):
+                value = value.to_dict()
+            elif isinstance(value, tuple):
+                value = [v.to_dict() if isinstance(v, Record) else v for v in value]
+            data[name] = value
+        return data
+
+
+class Provider(Record):
+    __slots__ = ("name", "title", "specialties", "education", "experience", "languages")
+    _vocab_fields = ("specialties", "languages")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        record = super().from_dict(data)
+        if record.title is not None:
+            record.title = sys.intern(record.title)
+        return record
+
+
+class ContactInfo(Record):
+    __slots__ = ("phone_numbers", "address", "email", "website", "social_media")
+
+
+class HoursInfo(Record):
+    __slots__ = ("regular_hours", "holiday_hours", "appointment_policies", "emergency_hours")
+    _vocab_maps = ("regular_hours", "appointment_policies")
+
+
+class ServiceCatalog(Record):
+    __slots__ = ("medical_services", "surgical_services", "diagnostic_services",
+                 "optical_services", "specialty_programs", "conditions_treated")
+    _vocab_fields = __slots__
+
+
+class InsuranceInfo(Record):
+    __slots__ = ("accepted_plans", "payment_policies", "special_notes")
+    _vocab_fields = ("accepted_plans", "special_notes")
+    _vocab_maps = ("payment_policies",)
+
+
+class PatientExperience(Record):
+    __slots__ = ("walk_in_policy", "wait_time_expectations", "what_to_bring", "facility_policies",
+                 "accessibility", "patient_portal", "communication_preferences")
+    _vocab_fields = ("what_to_bring", "facility_policies", "communication_preferences")
+
+
+class ClinicData(Record):
+    __slots__ = ("contact_info", "hours_info", "provider_info", "services_info",
+                 "insurance_info", "patient_experience")
+    _nested = {
+        "contact_info": ContactInfo,
+        "hours_info": HoursInfo,
+        "services_info": ServiceCatalog,
+        "insurance_info": InsuranceInfo,
+        "patient_experience": PatientExperience,
+    }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        data = dict(data)
+        providers = data.pop("provider_info", None)
+        record = super().from_dict(data)
+        if providers is not None:
+            record.provider_info = tuple(Provider.from_dict(p) for p in providers)
+        return record
+
+
+class ClinicResult(Record):
+    """One scraper output (the structure save_to_json writes), tagged with its job in fleet files"""
+
+    __slots__ = ("clinic_key", "base_url", "clinic_name", "extraction_timestamp", "confidence_levels",
+                 "identified_gaps", "data", "overall_confidence", "data_completeness")
+    _vocab_fields = ("identified_gaps",)
+    _nested = {"data": ClinicData}
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        # The job tags only exist in fleet files, the scores only once scrape_all_data finished
+        for name in ("clinic_key", "base_url", "overall_confidence", "data_completeness"):
+            if data[name] is None:
+                del data[name]
+        return data
+
+
+def loads(text: str) -> ClinicResult:
+    """Decode one scraper output from JSON"""
+    return ClinicResult.from_dict(orjson.loads(text) if orjson is not None else json.loads(text))
+
+
+def dumps(record: ClinicResult) -> str:
+    """Encode a ClinicResult as compact JSON"""
+    if orjson is not None:
+        return orjson.dumps(record.to_dict()).decode("utf-8")
+    return json.dumps(record.to_dict(), ensure_ascii=False, separators=(",", ":"))
+
+
+def load_fleet(jsonl_path: str) -> Iterator[ClinicResult]:
+    """Stream ClinicResults from a fleet file with one scraper output per line"""
+    with open(jsonl_path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
+
+
+def save_fleet(records: List[ClinicResult], jsonl_path: str):
+    """Write ClinicResults as one JSON object per line"""
+    with open(jsonl_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(dumps(record) + "\n")
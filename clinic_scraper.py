@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Shared fetch pipeline for the clinic scrapers
+Subclasses set the clinic identity and implement the extract_* methods; fetching, archiving,
+replay, recrawl scheduling and the overall scoring live here
+"""
+
+import requests
+from bs4 import BeautifulSoup
+import json
+from datetime import datetime
+from typing import Dict, Optional, Any
+import time
+import logging
+
+from circuit_breaker import OPEN, HostCircuitBreakers, default_breakers, is_host_failure
+from fetch_budget import Deadline, DeadlineExceeded, LatencyTracker, default_latency, hedged_get
+from page_decode import MAX_BODY_BYTES, BodyTooLarge, decode_body, read_body
+from page_store import PageStore, job_key, new_run_id
+from recrawl_scheduler import RecrawlScheduler
+from scraper_logging import log_context
+
+logger = logging.getLogger(__name__)
+
+class ClinicScraper:
+    """Base class for a single clinic's scraper"""
+    clinic_key: str = ""
+    clinic_name: str = ""
+    default_base_url: str = ""
+    # Approximate target field count used for data completeness
+    total_fields: int = 30
+    
+    def __init__(self, breakers: Optional[HostCircuitBreakers] = None, time_budget: Optional[float] = None,
+                 hedge_percentile: Optional[float] = None, latency: Optional[LatencyTracker] = None,
+                 page_store: Optional[PageStore] = None, run_id: Optional[str] = None,
+                 replay_run_id: Optional[str] = None, base_url: Optional[str] = None,
+                 scheduler: Optional[RecrawlScheduler] = None, max_body_bytes: int = MAX_BODY_BYTES,
+                 truncate_oversize: bool = True):
+        # base_url can point the scraper at a mirror or a local simulator
+        self.base_url = (base_url or self.default_base_url).rstrip("/")
+        # Archived pages are indexed per job so several sites for one clinic can share a run
+        self.job_key = job_key(self.clinic_key, base_url)
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        })
+        self.breakers = breakers or default_breakers
+        self.time_budget = time_budget
+        self.deadline = Deadline(time_budget)
+        self.hedge_percentile = hedge_percentile
+        self.latency = latency or default_latency
+        self.skipped_pages = []
+        self.page_store = page_store
+        self.run_id = run_id or new_run_id()
+        # When replaying, pages come from an archived run instead of the network
+        self.replay_index = None
+        if replay_run_id:
+            if page_store is None:
+                raise ValueError("replay_run_id requires a page_store")
+            self.replay_index = page_store.load_index(replay_run_id, self.job_key)
+        self.scheduler = scheduler
+        # Bodies past the limit are cut off (or refused) before they are archived or parsed
+        self.max_body_bytes = max_body_bytes
+        self.truncate_oversize = truncate_oversize
+        self.clinic_data = {
+            "clinic_name": self.clinic_name,
+            "extraction_timestamp": datetime.now().isoformat(),
+            "confidence_levels": {},
+            "identified_gaps": [],
+            "data": {}
+        }
+        
+    def fetch_page(self, url: str, max_retries: int = 3, optional: bool = False) -> Optional[BeautifulSoup]:
+        """Fetch and parse a webpage with retry logic"""
+        if self.replay_index is not None:
+            return self._load_archived(url)
+        
+        # Pages the recrawl plan says are not due are served from their last archived copy
+        if self.scheduler and self.page_store and not self.scheduler.is_due(url):
+            cached = self._load_cached(url)
+            if cached is not None:
+                return cached
+        
+        # Optional pages are dropped first when the clinic's time budget runs low
+        if self.deadline.expired() or (optional and self.deadline.near()):
+            logger.warning("Time budget nearly spent, skipping %s", url, extra={"url": url})
+            self.skipped_pages.append(url)
+            return None
+        
+        breaker = self.breakers.for_url(url)
+        for attempt in range(max_retries):
+            # Short-circuit to the caller's fallback path while the host is down
+            if not breaker.allow_request():
+                logger.warning("Circuit open for %s, skipping %s", breaker.host, url, extra={"url": url})
+                return None
+            try:
+                # Per-attempt messages are tagged so high-concurrency runs can sample them
+                logger.info("Fetching: %s (attempt %d)", url, attempt + 1,
+                            extra={"url": url, "attempt": attempt + 1, "sample": "fetch"})
+                started = time.monotonic()
+                response = self._get(url)
+                response.raise_for_status()
+                # Time to headers, the same span a hedge races against
+                self.latency.record(time.monotonic() - started)
+                body, truncated = read_body(response, self.max_body_bytes, self.truncate_oversize, self.deadline)
+                if truncated:
+                    logger.warning("Truncated %s to %d bytes", url, self.max_body_bytes, extra={"url": url})
+                content_type = response.headers.get('Content-Type')
+                digest = None
+                if self.page_store:
+                    # Archive the raw body so extractors can be re-run without re-crawling
+                    digest = self.page_store.save_page(self.run_id, self.job_key, url, body, content_type,
+                                                       base_url=self.base_url)
+                if self.scheduler:
+                    self.scheduler.observe(url, body, digest, content_type=content_type)
+                breaker.record_success()
+                # Parsing decoded text spares BeautifulSoup its own encoding detection
+                return BeautifulSoup(decode_body(body, content_type, truncated), 'html.parser')
+            except BodyTooLarge as e:
+                logger.warning("Refusing %s: %s", url, e, extra={"url": url})
+                breaker.record_success()
+                return None
+            except DeadlineExceeded:
+                # The host answered, it is just too slow for what is left of the budget
+                logger.warning("Time budget exhausted while downloading %s", url, extra={"url": url})
+                breaker.record_success()
+                self.skipped_pages.append(url)
+                return None
+            except requests.RequestException as e:
+                if e.response is not None:
+                    # Streamed error responses hold their connection until closed
+                    e.response.close()
+                logger.warning("Failed to fetch %s: %s", url, e, extra={"url": url, "attempt": attempt + 1})
+                if is_host_failure(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if attempt == max_retries - 1:
+                    logger.error("Max retries exceeded for %s", url, extra={"url": url})
+                    return None
+                backoff = 2 ** attempt  # Exponential backoff
+                if self.deadline.remaining() <= backoff:
+                    logger.warning("Time budget exhausted, giving up on %s", url, extra={"url": url})
+                    self.skipped_pages.append(url)
+                    return None
+                if breaker.state != OPEN:
+                    time.sleep(backoff)
+            except Exception:
+                # Anything else (e.g. the page store failing to write) must not hold the probe forever
+                breaker.release_probe()
+                raise
+    
+    def _load_archived(self, url: str) -> Optional[BeautifulSoup]:
+        """Parse the archived copy of a page from the replayed run"""
+        entry = self.replay_index.get(url)
+        if entry is None:
+            logger.warning("No archived copy of %s", url, extra={"url": url})
+            return None
+        return BeautifulSoup(decode_body(self.page_store.get(entry["sha256"]), entry.get("content_type")),
+                             'html.parser')
+    
+    def _load_cached(self, url: str) -> Optional[BeautifulSoup]:
+        """Parse the last archived copy of a page that is not due for a recrawl"""
+        digest, content_type = self.scheduler.cached_copy(url)
+        try:
+            body = self.page_store.get(digest)
+        except KeyError:
+            return None
+        self.page_store.save_page(self.run_id, self.job_key, url, body, content_type, from_cache=True,
+                                  base_url=self.base_url)
+        return BeautifulSoup(decode_body(body, content_type), 'html.parser')
+    
+    def _get(self, url: str) -> requests.Response:
+        """Issue a GET bounded by the clinic deadline, hedged past the latency percentile if enabled"""
+        timeout = self.deadline.timeout(10)
+        if self.hedge_percentile is not None:
+            hedge_after = self.latency.percentile(self.hedge_percentile)
+            if hedge_after is not None and hedge_after < timeout:
+                return hedged_get(self.session, url, timeout, hedge_after, stream=True)
+        # Streamed so read_body can stop at the size limit
+        return self.session.get(url, timeout=timeout, stream=True)
+    
+    def scrape_all_data(self) -> Dict[str, Any]:
+        """Orchestrate the complete data extraction"""
+        # Tag every record logged during this clinic's run, including fetches
+        with log_context(clinic_key=self.job_key, run_id=self.run_id):
+            logger.info("Starting comprehensive data extraction...")
+        
+            # The time budget covers the whole clinic, starting now
+            self.deadline = Deadline(self.time_budget)
+            self.skipped_pages = []
+        
+            self.clinic_data["data"] = {
+                "contact_info": self.extract_contact_info(),
+                "hours_info": self.extract_hours_info(), 
+                "provider_info": self.extract_provider_info(),
+                "services_info": self.extract_services_info(),
+                "insurance_info": self.extract_insurance_info(),
+                "patient_experience": self.extract_patient_experience()
+            }
+        
+            # Mark partial results when the time budget forced pages to be skipped
+            for url in dict.fromkeys(self.skipped_pages):
+                self.clinic_data["identified_gaps"].append(f"Partial data: skipped {url} (time budget reached)")
+        
+            # Calculate overall confidence
+            confidences = list(self.clinic_data["confidence_levels"].values())
+            self.clinic_data["overall_confidence"] = sum(confidences) / len(confidences) if confidences else 0
+        
+            # Calculate data completeness
+            extracted_fields = self._count_extracted_fields()
+            self.clinic_data["data_completeness"] = extracted_fields / self.total_fields
+        
+            logger.info("Extraction complete. Overall confidence: %.2f", self.clinic_data['overall_confidence'])
+            logger.info("Data completeness: %.2f%%", self.clinic_data['data_completeness'] * 100)
+        
+            return self.clinic_data
+    
+    def _count_extracted_fields(self) -> int:
+        """Count non-empty extracted fields"""
+        count = 0
+        data = self.clinic_data["data"]
+        
+        # Count contact fields
+        if data["contact_info"]["phone_numbers"]:
+            count += len(data["contact_info"]["phone_numbers"])
+        if data["contact_info"]["address"]:
+            count += 1
+            
+        # Count hours fields  
+        if data["hours_info"]["regular_hours"]:
+            count += 1
+        if data["hours_info"]["appointment_policies"]:
+            count += len(data["hours_info"]["appointment_policies"])
+            
+        # Count provider fields
+        count += len(data["provider_info"])
+        
+        # Count service fields
+        services = data["services_info"]
+        for service_type in services:
+            if services[service_type]:
+                count += 1
+                
+        # Count insurance fields
+        if data["insurance_info"]["accepted_plans"]:
+            count += 1
+        if data["insurance_info"]["payment_policies"]:
+            count += len(data["insurance_info"]["payment_policies"])
+            
+        # Count patient experience fields
+        experience = data["patient_experience"]
+        for field in experience:
+            if experience[field]:
+                count += 1
+                
+        return count
+    
+    def save_to_json(self, filename: Optional[str] = None):
+        """Save extracted data to JSON file, <clinic_key>_data.json by default"""
+        filename = filename or f"{self.clinic_key}_data.json"
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.clinic_data, f, indent=2, ensure_ascii=False)
+        logger.info("Data saved to %s", filename)
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Delta SQL generator for scraped clinic data
+Compares a clinic's new scrape output with the snapshot of what was last loaded and emits
+only the INSERT/UPDATE/DELETE statements for rows that changed, batched per table
+"""
+
+import argparse
+import json
+import os
+import re
+import logging
+from typing import Dict, List, Optional, Any, Tuple
+
+from reextract import output_path
+from scraper_logging import configure_logging
+
+logger = logging.getLogger(__name__)
+
+# Natural key of each table within a clinic (the tables have no unique constraints to upsert on)
+TABLE_KEYS = {
+    "clinic_scraped_data": ("data_category",),
+    "providers": ("name",),
+    "clinic_services": ("service_category", "service_name"),
+    "clinic_insurance": ("plan_name",),
+    "clinic_policies": ("policy_category", "policy_name"),
+    "clinic_conditions": ("condition_name",),
+    "clinic_contact_info": ("contact_type", "contact_label"),
+    "clinic_hours": ("day_of_week",),
+}
+
+# Columns that need an explicit cast when written as literals
+COLUMN_TYPES = {
+    "data_json": "jsonb",
+    "specialties": "text[]",
+    "open_time": "time",
+    "close_time": "time",
+}
+
+# Timestamp column bumped on UPDATE; clinic_services, clinic_insurance and clinic_policies have
+# triggers that maintain their updated_at (see database/clinic_intelligence_schema.sql)
+TOUCH_COLUMNS = {
+    "clinic_scraped_data": "last_updated",
+}
+
+SERVICE_CATEGORIES = {
+    "medical_services": "medical",
+    "surgical_services": "surgical",
+    "diagnostic_services": "diagnostic",
+    "optical_services": "optical",
+    "specialty_programs": "specialty",
+}
+
+DAYS_OF_WEEK = {
+    "sunday": 0, "monday": 1, "tuesday": 2, "wednesday": 3,
+    "thursday": 4, "friday": 5, "saturday": 6,
+}
+
+GOVERNMENT_PLANS = ("medicare", "medicaid", "chip", "tricare")
+
+# Snapshots for generated but not yet loaded SQL, promoted by --mark-applied
+PENDING_SNAPSHOT_DIR = "pending"
+
+
+def _label(key: str) -> str:
+    return key.replace("_", " ").title()
+
+
+def _policy_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    return str(value)
+
+
+def _parse_time(text: str) -> Optional[str]:
+    """'8:00 AM' -> '08:00:00'"""
+    match = re.match(r'\s*(\d{1,2}):(\d{2})\s*([AP]M)', text, re.IGNORECASE)
+    if not match:
+        return None
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2)), match.group(3).upper()
+    if meridiem == "PM" and hour != 12:
+        hour += 12
+    if meridiem == "AM" and hour == 12:
+        hour = 0
+    return f"{hour:02d}:{minute:02d}:00"
+
+
+def build_rows(clinic_data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Map one scraper output onto the rows it should produce in each table"""
+    data = clinic_data["data"]
+    confidence = clinic_data.get("confidence_levels", {})
+    rows = {table: [] for table in TABLE_KEYS}
+
+    for category, value in data.items():
+        rows["clinic_scraped_data"].append({
+            "data_category": category,
+            "data_json": value,
+            "confidence_level": confidence.get(category),
+            "source": "scraper",
+        })
+
+    for i, provider in enumerate(data.get("provider_info", [])):
+        rows["providers"].append({
+            "name": provider["name"],
+            "title": provider.get("title"),
+            "specialties": provider.get("specialties") or [],
+            "education": provider.get("education"),
+            "experience": provider.get("experience"),
+            "is_active": True,
+            "is_default": i == 0,
+            "display_order": i + 1,
+        })
+
+    services = data.get("services_info", {})
+    for field, category in SERVICE_CATEGORIES.items():
+        for i, name in enumerate(services.get(field) or []):
+            rows["clinic_services"].append({
+                "service_category": category,
+                "service_name": name,
+                "is_active": True,
+                "display_order": i + 1,
+            })
+    for name in services.get("conditions_treated") or []:
+        rows["clinic_conditions"].append({"condition_name": name, "is_active": True})
+
+    insurance = data.get("insurance_info", {})
+    for plan in insurance.get("accepted_plans") or []:
+        plan_type = "government" if any(p in plan.lower() for p in GOVERNMENT_PLANS) else "commercial"
+        rows["clinic_insurance"].append({"plan_name": plan, "plan_type": plan_type, "is_active": True})
+
+    policy_sources = [
+        ("appointment", data.get("hours_info", {}).get("appointment_policies") or {}),
+        ("payment", insurance.get("payment_policies") or {}),
+    ]
+    for category, policies in policy_sources:
+        for key, value in policies.items():
+            rows["clinic_policies"].append({
+                "policy_category": category,
+                "policy_name": _label(key),
+                "policy_value": _policy_value(value),
+                "is_active": True,
+            })
+    experience = data.get("patient_experience", {})
+    for category, field in [("facility", "facility_policies"), ("communication", "communication_preferences")]:
+        for text in experience.get(field) or []:
+            rows["clinic_policies"].append({
+                "policy_category": category,
+                "policy_name": text,
+                "policy_value": text,
+                "is_active": True,
+            })
+
+    contact = data.get("contact_info", {})
+    for label, number in (contact.get("phone_numbers") or {}).items():
+        rows["clinic_contact_info"].append({
+            "contact_type": "phone", "contact_label": _label(label), "contact_value": number,
+            "is_primary": label == "main", "is_active": True,
+        })
+    address = (contact.get("address") or {}).get("full_address")
+    if address:
+        rows["clinic_contact_info"].append({
+            "contact_type": "address", "contact_label": "Main Office", "contact_value": address,
+            "is_primary": True, "is_active": True,
+        })
+    for contact_type in ("email", "website"):
+        if contact.get(contact_type):
+            rows["clinic_contact_info"].append({
+                "contact_type": contact_type, "contact_label": _label(contact_type),
+                "contact_value": contact[contact_type], "is_primary": False, "is_active": True,
+            })
+    for network, link in (contact.get("social_media") or {}).items():
+        rows["clinic_contact_info"].append({
+            "contact_type": "social", "contact_label": _label(network), "contact_value": link,
+            "is_primary": False, "is_active": True,
+        })
+
+    for day, hours in (data.get("hours_info", {}).get("regular_hours") or {}).items():
+        if day.lower() not in DAYS_OF_WEEK:
+            continue
+        closed = hours.strip().lower() == "closed"
+        open_time = close_time = None
+        if not closed and "-" in hours:
+            start, end = hours.split("-", 1)
+            open_time, close_time = _parse_time(start), _parse_time(end)
+        rows["clinic_hours"].append({
+            "day_of_week": DAYS_OF_WEEK[day.lower()],
+            "open_time": open_time,
+            "close_time": close_time,
+            "is_closed": closed,
+            "is_active": True,
+        })
+
+    return rows
+
+
+def _row_key(table: str, row: Dict[str, Any]) -> Tuple:
+    return tuple(row[column] for column in TABLE_KEYS[table])
+
+
+def _index_rows(table: str, rows: List[Dict[str, Any]]) -> Dict[Tuple, Dict[str, Any]]:
+    # First occurrence wins when an extractor repeats a value
+    index = {}
+    for row in rows:
+        index.setdefault(_row_key(table, row), row)
+    return index
+
+
+def sql_literal(value: Any, column: Optional[str] = None) -> str:
+    """Render a Python value as a PostgreSQL literal"""
+    cast = COLUMN_TYPES.get(column)
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, list) and cast == "text[]":
+        if not value:
+            return "'{}'::text[]"
+        return "ARRAY[" + ", ".join(sql_literal(str(v)) for v in value) + "]"
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False)
+    literal = "'" + str(value).replace("'", "''") + "'"
+    if cast in ("jsonb", "time"):
+        literal += f"::{cast}"
+    return literal
+
+
+def _key_condition(table: str, clinic_id: int, keys: List[Tuple]) -> str:
+    columns = TABLE_KEYS[table]
+    if len(keys) == 1:
+        matches = [f"{c} = {sql_literal(v)}" for c, v in zip(columns, keys[0])]
+        return " AND ".join([f"clinic_id = {clinic_id}"] + matches)
+    if len(columns) == 1:
+        values = ", ".join(sql_literal(key[0]) for key in keys)
+        return f"clinic_id = {clinic_id} AND {columns[0]} IN ({values})"
+    values = ", ".join("(" + ", ".join(sql_literal(v) for v in key) + ")" for key in keys)
+    return f"clinic_id = {clinic_id} AND ({', '.join(columns)}) IN ({values})"
+
+
+def _insert_statement(table: str, clinic_id: int, rows: List[Dict[str, Any]]) -> str:
+    columns = ["clinic_id"] + list(rows[0])
+    values = ",\n".join(
+        "(" + ", ".join([str(clinic_id)] + [sql_literal(row[c], c) for c in columns[1:]]) + ")"
+        for row in rows
+    )
+    return f"INSERT INTO public.{table} ({', '.join(columns)})\nVALUES\n{values};"
+
+
+def _update_statement(table: str, clinic_id: int, changed: List[Tuple[Tuple, Dict[str, Any], List[str]]]) -> str:
+    """One UPDATE for every changed row of a table, joined to the new values through a VALUES list
+
+    Each row sets the union of the changed columns; a column a row did not change gets the value
+    it already holds.
+    """
+    keys = list(TABLE_KEYS[table])
+    columns = list(dict.fromkeys(c for _, _, row_columns in changed for c in row_columns))
+    if len(changed) == 1:
+        key, row, _ = changed[0]
+        assignments = [f"{c} = {sql_literal(row[c], c)}" for c in columns]
+        where = _key_condition(table, clinic_id, [key])
+    else:
+        # A column that is NULL in every row would come out of VALUES as text, so it is set directly
+        null_columns = [c for c in columns if all(row[c] is None for _, row, _ in changed)]
+        value_columns = [c for c in columns if c not in null_columns]
+        assignments = [f"{c} = v.{c}" for c in value_columns] + [f"{c} = NULL" for c in null_columns]
+        values = ",\n".join(
+            "(" + ", ".join([sql_literal(v) for v in key] + [sql_literal(row[c], c) for c in value_columns]) + ")"
+            for key, row, _ in changed
+        )
+        where = " AND ".join([f"t.clinic_id = {clinic_id}"] + [f"t.{c} = v.{c}" for c in keys])
+        where = f"(VALUES\n{values}\n) AS v({', '.join(keys + value_columns)})\nWHERE {where}"
+    if table in TOUCH_COLUMNS:
+        assignments.append(f"{TOUCH_COLUMNS[table]} = NOW()")
+    if len(changed) == 1:
+        return f"UPDATE public.{table} SET {', '.join(assignments)} WHERE {where};"
+    return f"UPDATE public.{table} AS t SET {', '.join(assignments)}\nFROM {where};"
+
+
+def diff_table(table: str, clinic_id: int, old_rows: List[Dict[str, Any]],
+               new_rows: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Statements that turn old_rows into new_rows for one table, split by kind"""
+    old_index = _index_rows(table, old_rows)
+    new_index = _index_rows(table, new_rows)
+    statements = {"delete": [], "update": [], "insert": []}
+
+    removed = [key for key in old_index if key not in new_index]
+    if removed:
+        statements["delete"].append(f"DELETE FROM public.{table} WHERE {_key_condition(table, clinic_id, removed)};")
+
+    changed = []
+    for key, row in new_index.items():
+        old = old_index.get(key)
+        if old is None:
+            continue
+        columns = [c for c in row if c not in TABLE_KEYS[table] and old.get(c) != row[c]]
+        if columns:
+            changed.append((key, row, columns))
+    # Clear is_default before setting it elsewhere, in a separate statement, so there is never
+    # a moment with two default providers
+    for is_default in (False, True):
+        group = [item for item in changed if bool(item[1].get("is_default")) == is_default]
+        if group:
+            statements["update"].append(_update_statement(table, clinic_id, group))
+
+    added = [row for key, row in new_index.items() if key not in old_index]
+    if added:
+        statements["insert"].append(_insert_statement(table, clinic_id, added))
+
+    return statements
+
+
+def generate_delta_sql(clinic_key: str, clinic_id: int, clinic_data: Dict[str, Any],
+                       snapshot: Optional[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+    """Return the SQL for one clinic and the snapshot it leaves the database in
+
+    Without a snapshot the clinic's rows are unknown, so every table is fully reloaded.
+    """
+    new_rows = build_rows(clinic_data)
+    lines = [
+        "-- =============================================",
+        f"-- {clinic_key} (clinic ID {clinic_id})",
+        "-- =============================================",
+    ]
+
+    if snapshot is None or snapshot.get("clinic_id") != clinic_id:
+        lines.append("-- No previous snapshot: full reload")
+        for table in TABLE_KEYS:
+            lines.append(f"DELETE FROM public.{table} WHERE clinic_id = {clinic_id};")
+        for table, rows in new_rows.items():
+            rows = list(_index_rows(table, rows).values())
+            if rows:
+                lines.append(_insert_statement(table, clinic_id, rows))
+    else:
+        per_kind = {"delete": [], "update": [], "insert": []}
+        for table in TABLE_KEYS:
+            statements = diff_table(table, clinic_id, snapshot["tables"].get(table, []), new_rows[table])
+            for kind, kind_statements in statements.items():
+                per_kind[kind].extend(kind_statements)
+        if not any(per_kind.values()):
+            lines.append("-- No changes")
+        # Deletes first so updates and inserts never collide with rows that are going away
+        for kind in ("delete", "update", "insert"):
+            lines.extend(per_kind[kind])
+
+    return "\n".join(lines) + "\n", {"clinic_id": clinic_id, "tables": new_rows}
+
+
+def load_snapshot(snapshot_dir: str, clinic_key: str) -> Optional[Dict[str, Any]]:
+    path = os.path.join(snapshot_dir, f"{clinic_key}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_snapshot(snapshot_dir: str, clinic_key: str, snapshot: Dict[str, Any]):
+    os.makedirs(snapshot_dir, exist_ok=True)
+    path = os.path.join(snapshot_dir, f"{clinic_key}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, indent=2, ensure_ascii=False)
+
+
+def mark_applied(snapshot_dir: str, clinic_keys: Optional[List[str]] = None) -> List[str]:
+    """Promote pending snapshots (default: all) once their SQL has been loaded; returns the clinic keys"""
+    pending_dir = os.path.join(snapshot_dir, PENDING_SNAPSHOT_DIR)
+    if clinic_keys is None:
+        names = os.listdir(pending_dir) if os.path.isdir(pending_dir) else []
+        clinic_keys = sorted(name[:-len(".json")] for name in names if name.endswith(".json"))
+    for clinic_key in clinic_keys:
+        pending = os.path.join(pending_dir, f"{clinic_key}.json")
+        if not os.path.exists(pending):
+            raise FileNotFoundError(f"No pending snapshot for {clinic_key} in {pending_dir}")
+        os.replace(pending, os.path.join(snapshot_dir, f"{clinic_key}.json"))
+    return clinic_keys
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    """Main execution function"""
+    parser = argparse.ArgumentParser(prog=prog, description="Generate minimal SQL for changed clinic data")
+    parser.add_argument("--clinic", action="append", metavar="KEY=ID",
+                        help="Clinic key and database clinic id, repeatable (e.g. fort_worth_ent=45)")
+    parser.add_argument("--data-dir", default=".", help="Directory holding <clinic_key>_data.json outputs")
+    parser.add_argument("--snapshot-dir", default="sql_snapshots", help="Directory of last-loaded snapshots")
+    parser.add_argument("--output", default="delta_migration.sql", help="SQL file to write")
+    parser.add_argument("--no-snapshot-update", action="store_true",
+                        help="Do not write pending snapshots (e.g. for a dry run)")
+    parser.add_argument("--mark-applied", action="store_true",
+                        help="Record that the generated SQL was loaded: promote pending snapshots "
+                             "(for the --clinic keys given, default all) instead of generating SQL")
+    args = parser.parse_args(argv)
+    if not args.clinic and not args.mark_applied:
+        parser.error("--clinic is required unless --mark-applied is given")
+    configure_logging()
+
+    if args.mark_applied:
+        clinic_keys = [spec.partition("=")[0] for spec in args.clinic] if args.clinic else None
+        try:
+            applied = mark_applied(args.snapshot_dir, clinic_keys)
+        except FileNotFoundError as e:
+            parser.error(str(e))
+        for clinic_key in applied:
+            logger.info("Snapshot for %s marked as applied", clinic_key)
+        return
+
+    sections = ["-- Delta migration generated from scraper output", "BEGIN;", ""]
+    snapshots = {}
+    for spec in args.clinic:
+        clinic_key, clinic_id = spec.split("=", 1)
+        with open(output_path(args.data_dir, clinic_key), encoding="utf-8") as f:
+            clinic_data = json.load(f)
+        sql, snapshots[clinic_key] = generate_delta_sql(
+            clinic_key, int(clinic_id), clinic_data, load_snapshot(args.snapshot_dir, clinic_key)
+        )
+        sections.append(sql)
+    sections.append("COMMIT;")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write("\n".join(sections) + "\n")
+    logger.info("Delta SQL saved to %s", args.output)
+
+    # The snapshot describes the database once this SQL has been applied, so it stays pending
+    # until --mark-applied confirms the load; regenerating before then still diffs against
+    # what the database actually holds
+    if not args.no_snapshot_update:
+        pending_dir = os.path.join(args.snapshot_dir, PENDING_SNAPSHOT_DIR)
+        for clinic_key, snapshot in snapshots.items():
+            save_snapshot(pending_dir, clinic_key, snapshot)
+        logger.info("Pending snapshots saved to %s; run with --mark-applied once %s is loaded",
+                    pending_dir, args.output)
+
+
+if __name__ == "__main__":
+    main()
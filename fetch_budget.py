@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Per-clinic time budget and hedged requests for the clinic scrapers
+Keeps one slow site from holding a worker past its deadline
+"""
+
+import threading
+import time
+import logging
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Share of the budget that must remain before an optional page is worth fetching, capped in seconds
+OPTIONAL_PAGE_RESERVE_FRACTION = 0.25
+OPTIONAL_PAGE_RESERVE = 15.0
+# Smallest per-request timeout handed to requests once the budget runs low
+MIN_REQUEST_TIMEOUT = 0.5
+
+
+class DeadlineExceeded(Exception):
+    """The clinic's time budget ran out part-way through a request"""
+
+
+class Deadline:
+    """Wall-clock budget for one clinic, passed down through every fetch and retry"""
+
+    def __init__(self, budget: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.budget = budget
+        self._clock = clock
+        self._started = clock()
+
+    def remaining(self) -> float:
+        """Seconds left in the budget (infinite when no budget was set)"""
+        if self.budget is None:
+            return float("inf")
+        return max(0.0, self.budget - (self._clock() - self._started))
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def near(self, reserve: Optional[float] = None) -> bool:
+        """Whether less than reserve seconds are left
+
+        The default reserve scales with the budget so short budgets still fetch optional pages.
+        """
+        if reserve is None:
+            if self.budget is None:
+                return False
+            reserve = min(OPTIONAL_PAGE_RESERVE, self.budget * OPTIONAL_PAGE_RESERVE_FRACTION)
+        return self.remaining() < reserve
+
+    def timeout(self, default: float) -> float:
+        """Clamp a per-request timeout so it cannot outlive the budget"""
+        return max(MIN_REQUEST_TIMEOUT, min(default, self.remaining()))
+
+
+class LatencyTracker:
+    """Rolling window of successful fetch latencies (time to response headers) for percentile lookups"""
+
+    def __init__(self, window: int = 200, min_samples: int = 10):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the pct-th percentile latency, or None until enough samples exist"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+def _start_request(fn: Callable, *args, **kwargs) -> Future:
+    """Run fn on a thread of its own and return its Future
+
+    A shared pool would queue requests behind other workers' fetches, and the queue wait
+    would count against hedge_after and trigger needless hedges.
+    """
+    future = Future()
+    future.set_running_or_notify_cancel()
+
+    def run():
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="hedge", daemon=True).start()
+    return future
+
+
+def _close_response(future):
+    if future.exception() is None:
+        future.result().close()
+
+
+def hedged_get(session, url: str, timeout: float, hedge_after: float, **request_kwargs):
+    """GET url, firing a second identical request if the first is slower than hedge_after
+
+    Returns whichever response arrives first; raises only if both requests fail. The losing
+    response is closed so streamed requests do not hold their connection.
+    """
+    primary = _start_request(session.get, url, timeout=timeout, **request_kwargs)
+    done, _ = wait([primary], timeout=hedge_after)
+    if done:
+        return primary.result()
+
+    logger.info("Hedging slow request to %s after %.2fs", url, hedge_after, extra={"url": url})
+    backup = _start_request(session.get, url, timeout=max(MIN_REQUEST_TIMEOUT, timeout - hedge_after),
+                         **request_kwargs)
+    pending = {primary, backup}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                response = future.result()
+            except Exception as e:
+                error = e
+                continue
+            for other in ({primary, backup} - {future}):
+                other.add_done_callback(_close_response)
+            return response
+    raise error
+
+
+# Shared by default so hedge thresholds reflect the whole fleet, not one clinic's few pages
+default_latency = LatencyTracker()
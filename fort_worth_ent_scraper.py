@@ -4,49 +4,20 @@ Fort Worth ENT & Sinus Clinic Scraper
 Extracts comprehensive clinic information for CalmClinic system prompt generation
 """
 
-import requests
-from bs4 import BeautifulSoup
-import json
 import re
-from datetime import datetime
-from typing import Dict, List, Optional, Any
-import time
+from typing import Dict, List, Any
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from clinic_scraper import ClinicScraper
+from scraper_logging import configure_logging
+
 logger = logging.getLogger(__name__)
 
-class FortWorthENTScraper:
-    def __init__(self):
-        self.base_url = "https://fortworthent.net"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        self.clinic_data = {
-            "clinic_name": "Fort Worth ENT & Sinus",
-            "extraction_timestamp": datetime.now().isoformat(),
-            "confidence_levels": {},
-            "identified_gaps": [],
-            "data": {}
-        }
-        
-    def fetch_page(self, url: str, max_retries: int = 3) -> Optional[BeautifulSoup]:
-        """Fetch and parse a webpage with retry logic"""
-        for attempt in range(max_retries):
-            try:
-                logger.info(f"Fetching: {url} (attempt {attempt + 1})")
-                response = self.session.get(url, timeout=10)
-                response.raise_for_status()
-                return BeautifulSoup(response.content, 'html.parser')
-            except requests.RequestException as e:
-                logger.warning(f"Failed to fetch {url}: {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-                else:
-                    logger.error(f"Max retries exceeded for {url}")
-                    return None
+class FortWorthENTScraper(ClinicScraper):
+    clinic_key = "fort_worth_ent"
+    clinic_name = "Fort Worth ENT & Sinus"
+    default_base_url = "https://fortworthent.net"
+    total_fields = 30
     
     def extract_contact_info(self) -> Dict[str, Any]:
         """Extract contact information from homepage and contact pages"""
@@ -224,7 +195,7 @@ class FortWorthENTScraper:
                         break
         
         # Try physician assistants page
-        pa_page = self.fetch_page(f"{self.base_url}/physician-assistants/")
+        pa_page = self.fetch_page(f"{self.base_url}/physician-assistants/", optional=True)
         if pa_page:
             # Could extract PA info here if needed
             pass
@@ -249,27 +220,29 @@ class FortWorthENTScraper:
         }
         
         # Key service pages to extract from
-        service_pages = [
+        core_pages = [
             # Main ENT services
             f"{self.base_url}/ear-nose-throat/",
             f"{self.base_url}/fort-worth-sinus-center/",
             f"{self.base_url}/fort-worth-thyroid-center/thyroid-disease/",
             f"{self.base_url}/audiology-hearing-loss/hearing-aids/",
-            f"{self.base_url}/allergies-fort-worth/",
-            
-            # Specific procedures
+            f"{self.base_url}/allergies-fort-worth/"
+        ]
+        procedure_pages = [
+            # Specific procedures - optional, skipped first when short on time
             f"{self.base_url}/vivaer-nasal-airway-remodeling/",
             f"{self.base_url}/fort-worth-sinus-center/balloon-sinuplasty/",
             f"{self.base_url}/fort-worth-sinus-center/office-ct-scan/",
             f"{self.base_url}/ear-nose-throat/snoring-obstructive-sleep-apnea-osa/",
             f"{self.base_url}/ear-nose-throat/voice-problems/"
         ]
+        service_pages = core_pages + procedure_pages
         
         extracted_services = set()
         extracted_conditions = set()
         
         for url in service_pages:
-            page = self.fetch_page(url)
+            page = self.fetch_page(url, optional=url in procedure_pages)
             if page:
                 text = page.get_text().lower()
                 
@@ -308,10 +281,10 @@ class FortWorthENTScraper:
                         services["conditions_treated"].append(keyword.title())
                         extracted_conditions.add(keyword)
         
-        # Remove duplicates and add comprehensive defaults
-        services["surgical_services"] = list(set(services["surgical_services"]))
-        services["medical_services"] = list(set(services["medical_services"]))
-        services["conditions_treated"] = list(set(services["conditions_treated"]))
+        # Remove duplicates (keeping first-seen order so reloads don't reshuffle rows) and add comprehensive defaults
+        services["surgical_services"] = list(dict.fromkeys(services["surgical_services"]))
+        services["medical_services"] = list(dict.fromkeys(services["medical_services"]))
+        services["conditions_treated"] = list(dict.fromkeys(services["conditions_treated"]))
         
         # Add default services if not found
         if not services["surgical_services"]:
@@ -440,79 +413,6 @@ class FortWorthENTScraper:
         
         self.clinic_data["confidence_levels"]["patient_experience"] = 0.75
         return patient_experience
-    
-    def scrape_all_data(self) -> Dict[str, Any]:
-        """Orchestrate the complete data extraction"""
-        logger.info("Starting comprehensive data extraction...")
-        
-        self.clinic_data["data"] = {
-            "contact_info": self.extract_contact_info(),
-            "hours_info": self.extract_hours_info(), 
-            "provider_info": self.extract_provider_info(),
-            "services_info": self.extract_services_info(),
-            "insurance_info": self.extract_insurance_info(),
-            "patient_experience": self.extract_patient_experience()
-        }
-        
-        # Calculate overall confidence
-        confidences = list(self.clinic_data["confidence_levels"].values())
-        self.clinic_data["overall_confidence"] = sum(confidences) / len(confidences) if confidences else 0
-        
-        # Calculate data completeness
-        total_fields = 30  # Approximate target field count for ENT
-        extracted_fields = self._count_extracted_fields()
-        self.clinic_data["data_completeness"] = extracted_fields / total_fields
-        
-        logger.info(f"Extraction complete. Overall confidence: {self.clinic_data['overall_confidence']:.2f}")
-        logger.info(f"Data completeness: {self.clinic_data['data_completeness']:.2%}")
-        
-        return self.clinic_data
-    
-    def _count_extracted_fields(self) -> int:
-        """Count non-empty extracted fields"""
-        count = 0
-        data = self.clinic_data["data"]
-        
-        # Count contact fields
-        if data["contact_info"]["phone_numbers"]:
-            count += len(data["contact_info"]["phone_numbers"])
-        if data["contact_info"]["address"]:
-            count += 1
-            
-        # Count hours fields  
-        if data["hours_info"]["regular_hours"]:
-            count += 1
-        if data["hours_info"]["appointment_policies"]:
-            count += len(data["hours_info"]["appointment_policies"])
-            
-        # Count provider fields
-        count += len(data["provider_info"])
-        
-        # Count service fields
-        services = data["services_info"]
-        for service_type in services:
-            if services[service_type]:
-                count += 1
-                
-        # Count insurance fields
-        if data["insurance_info"]["accepted_plans"]:
-            count += 1
-        if data["insurance_info"]["payment_policies"]:
-            count += len(data["insurance_info"]["payment_policies"])
-            
-        # Count patient experience fields
-        experience = data["patient_experience"]
-        for field in experience:
-            if experience[field]:
-                count += 1
-                
-        return count
-    
-    def save_to_json(self, filename: str = "fort_worth_ent_data.json"):
-        """Save extracted data to JSON file"""
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(self.clinic_data, f, indent=2, ensure_ascii=False)
-        logger.info(f"Data saved to {filename}")
 
 def main():
     """Main execution function"""
@@ -538,8 +438,9 @@ def main():
                 print(f"  - {gap}")
                 
     except Exception as e:
-        logger.error(f"Scraping failed: {e}")
+        logger.error("Scraping failed: %s", e)
         raise
 
 if __name__ == "__main__":
+    configure_logging()
     main()
\ No newline at end of file
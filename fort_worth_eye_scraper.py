@@ -4,49 +4,20 @@ Fort Worth Eye Associates Clinic Scraper
 Extracts comprehensive clinic information for CalmClinic system prompt generation
 """
 
-import requests
-from bs4 import BeautifulSoup
-import json
 import re
-from datetime import datetime
-from typing import Dict, List, Optional, Any
-import time
+from typing import Dict, List, Any
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from clinic_scraper import ClinicScraper
+from scraper_logging import configure_logging
+
 logger = logging.getLogger(__name__)
 
-class FortWorthEyeScraper:
-    def __init__(self):
-        self.base_url = "https://www.ranelle.com"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        self.clinic_data = {
-            "clinic_name": "Fort Worth Eye Associates",
-            "extraction_timestamp": datetime.now().isoformat(),
-            "confidence_levels": {},
-            "identified_gaps": [],
-            "data": {}
-        }
-        
-    def fetch_page(self, url: str, max_retries: int = 3) -> Optional[BeautifulSoup]:
-        """Fetch and parse a webpage with retry logic"""
-        for attempt in range(max_retries):
-            try:
-                logger.info(f"Fetching: {url} (attempt {attempt + 1})")
-                response = self.session.get(url, timeout=10)
-                response.raise_for_status()
-                return BeautifulSoup(response.content, 'html.parser')
-            except requests.RequestException as e:
-                logger.warning(f"Failed to fetch {url}: {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-                else:
-                    logger.error(f"Max retries exceeded for {url}")
-                    return None
+class FortWorthEyeScraper(ClinicScraper):
+    clinic_key = "fort_worth_eye"
+    clinic_name = "Fort Worth Eye Associates"
+    default_base_url = "https://www.ranelle.com"
+    total_fields = 25
     
     def extract_contact_info(self) -> Dict[str, Any]:
         """Extract contact information from homepage and contact page"""
@@ -302,79 +273,6 @@ class FortWorthEyeScraper:
             self.clinic_data["identified_gaps"].append(gap)
             
         return patient_experience
-    
-    def scrape_all_data(self) -> Dict[str, Any]:
-        """Orchestrate the complete data extraction"""
-        logger.info("Starting comprehensive data extraction...")
-        
-        self.clinic_data["data"] = {
-            "contact_info": self.extract_contact_info(),
-            "hours_info": self.extract_hours_info(), 
-            "provider_info": self.extract_provider_info(),
-            "services_info": self.extract_services_info(),
-            "insurance_info": self.extract_insurance_info(),
-            "patient_experience": self.extract_patient_experience()
-        }
-        
-        # Calculate overall confidence
-        confidences = list(self.clinic_data["confidence_levels"].values())
-        self.clinic_data["overall_confidence"] = sum(confidences) / len(confidences) if confidences else 0
-        
-        # Calculate data completeness
-        total_fields = 25  # Approximate target field count
-        extracted_fields = self._count_extracted_fields()
-        self.clinic_data["data_completeness"] = extracted_fields / total_fields
-        
-        logger.info(f"Extraction complete. Overall confidence: {self.clinic_data['overall_confidence']:.2f}")
-        logger.info(f"Data completeness: {self.clinic_data['data_completeness']:.2%}")
-        
-        return self.clinic_data
-    
-    def _count_extracted_fields(self) -> int:
-        """Count non-empty extracted fields"""
-        count = 0
-        data = self.clinic_data["data"]
-        
-        # Count contact fields
-        if data["contact_info"]["phone_numbers"]:
-            count += len(data["contact_info"]["phone_numbers"])
-        if data["contact_info"]["address"]:
-            count += 1
-            
-        # Count hours fields  
-        if data["hours_info"]["regular_hours"]:
-            count += 1
-        if data["hours_info"]["appointment_policies"]:
-            count += len(data["hours_info"]["appointment_policies"])
-            
-        # Count provider fields
-        count += len(data["provider_info"])
-        
-        # Count service fields
-        services = data["services_info"]
-        for service_type in services:
-            if services[service_type]:
-                count += 1
-                
-        # Count insurance fields
-        if data["insurance_info"]["accepted_plans"]:
-            count += 1
-        if data["insurance_info"]["payment_policies"]:
-            count += len(data["insurance_info"]["payment_policies"])
-            
-        # Count patient experience fields
-        experience = data["patient_experience"]
-        for field in experience:
-            if experience[field]:
-                count += 1
-                
-        return count
-    
-    def save_to_json(self, filename: str = "fort_worth_eye_data.json"):
-        """Save extracted data to JSON file"""
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(self.clinic_data, f, indent=2, ensure_ascii=False)
-        logger.info(f"Data saved to {filename}")
 
 def main():
     """Main execution function"""
@@ -400,8 +298,9 @@ def main():
                 print(f"  - {gap}")
                 
     except Exception as e:
-        logger.error(f"Scraping failed: {e}")
+        logger.error("Scraping failed: %s", e)
         raise
 
 if __name__ == "__main__":
+    configure_logging()
     main()
\ No newline at end of file
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Body size guard and charset decoding for fetched pages
+Bodies are read in chunks up to a byte limit and decoded to text before parsing, using the
+declared charset where there is one so BeautifulSoup skips its own encoding detection
+"""
+
+import codecs
+import re
+import logging
+from typing import Iterator, Optional, Tuple
+
+from fetch_budget import Deadline, DeadlineExceeded
+
+try:
+    from charset_normalizer import from_bytes
+    from charset_normalizer.utils import is_multi_byte_encoding
+except ImportError:  # detection is optional, undeclared non-UTF-8 pages fall back to cp1252
+    from_bytes = None
+
+logger = logging.getLogger(__name__)
+
+# Largest body read from a response; clinic pages are far smaller, anything bigger is a stray file
+MAX_BODY_BYTES = 5 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+# Browsers only look for <meta charset> near the top of the document
+META_SCAN_BYTES = 4096
+# Encoding detection runs on a prefix only; its cost grows with the input
+DETECT_SAMPLE_BYTES = 64 * 1024
+
+_CHARSET_PARAM = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.I)
+_META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.I)
+_BOMS = ((codecs.BOM_UTF8, "utf-8"), (codecs.BOM_UTF16_LE, "utf-16-le"), (codecs.BOM_UTF16_BE, "utf-16-be"))
+# Labels that browsers decode as windows-1252, as servers often mean it when they say latin-1
+_WINDOWS_1252_ALIASES = {"iso8859-1", "ascii"}
+
+
+class BodyTooLarge(ValueError):
+    """Response body exceeds the configured limit and truncation is disabled"""
+
+
+def _iter_available(response) -> Iterator[bytes]:
+    """Yield body data as it arrives rather than in full CHUNK_SIZE blocks"""
+    raw = response.raw
+    if not hasattr(raw, "read1"):  # urllib3 < 2
+        yield from response.iter_content(CHUNK_SIZE)
+        return
+
+    from requests.exceptions import ChunkedEncodingError, ConnectionError, ContentDecodingError
+    from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError
+
+    # Same translation iter_content applies, so callers only handle requests exceptions
+    try:
+        while True:
+            chunk = raw.read1(CHUNK_SIZE, decode_content=True)
+            if not chunk:
+                return
+            yield chunk
+    except ProtocolError as e:
+        raise ChunkedEncodingError(e)
+    except DecodeError as e:
+        raise ContentDecodingError(e)
+    except ReadTimeoutError as e:
+        raise ConnectionError(e)
+
+
+def read_body(response, max_bytes: int = MAX_BODY_BYTES, truncate: bool = True,
+              deadline: Optional[Deadline] = None) -> Tuple[bytes, bool]:
+    """Read a streamed response up to max_bytes and return (body, truncated)
+
+    With truncate=False an oversized body raises BodyTooLarge, before reading anything when
+    Content-Length already gives it away. DeadlineExceeded is raised once deadline runs out,
+    since request timeouts only bound each socket read, not a slowly trickled body.
+    """
+    length = response.headers.get("Content-Length", "")
+    if not truncate and length.isdigit() and int(length) > max_bytes:
+        response.close()
+        raise BodyTooLarge(f"{response.url} is {length} bytes, limit is {max_bytes}")
+
+    chunks, size = [], 0
+    for chunk in _iter_available(response):
+        if deadline is not None and deadline.expired():
+            response.close()
+            raise DeadlineExceeded(f"time budget ran out while downloading {response.url}")
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > max_bytes:
+            response.close()
+            if not truncate:
+                raise BodyTooLarge(f"{response.url} exceeds the {max_bytes} byte limit")
+            return b"".join(chunks)[:max_bytes], True
+    return b"".join(chunks), False
+
+
+def _codec_name(label: Optional[str]) -> Optional[str]:
+    if not label:
+        return None
+    try:
+        name = codecs.lookup(label).name
+    except LookupError:
+        return None
+    return "cp1252" if name in _WINDOWS_1252_ALIASES else name
+
+
+def declared_charset(content_type: Optional[str]) -> Optional[str]:
+    """Charset parameter of a Content-Type header"""
+    match = _CHARSET_PARAM.search(content_type or "")
+    return match.group(1) if match else None
+
+
+def meta_charset(body: bytes) -> Optional[str]:
+    """Charset from a <meta charset> or http-equiv Content-Type tag at the top of the page"""
+    match = _META_CHARSET.search(body[:META_SCAN_BYTES])
+    return match.group(1).decode("ascii", "replace") if match else None
+
+
+def _strict_decode(body: bytes, codec: str, final: bool) -> Optional[str]:
+    # A non-final decode drops a multi-byte sequence cut off by truncation instead of failing
+    try:
+        return codecs.getincrementaldecoder(codec)().decode(body, final=final)
+    except UnicodeDecodeError:
+        return None
+
+
+def decode_body(body: bytes, content_type: Optional[str] = None, truncated: bool = False) -> str:
+    """Decode a page to text: BOM, then HTTP charset, then meta charset, then UTF-8, then detection
+
+    truncated tolerates a multi-byte character cut off at the end of the body.
+    """
+    for bom, codec in _BOMS:
+        if body.startswith(bom):
+            return body[len(bom):].decode(codec, "replace")
+
+    for label in (declared_charset(content_type), meta_charset(body), "utf-8"):
+        codec = _codec_name(label)
+        if codec:
+            text = _strict_decode(body, codec, final=not truncated)
+            if text is not None:
+                return text
+
+    if from_bytes is not None:
+        best = from_bytes(body[:DETECT_SAMPLE_BYTES]).best()
+        # Single-byte guesses confuse neighbouring Latin code pages, so only multi-byte ones are trusted
+        if best is not None and is_multi_byte_encoding(best.encoding):
+            logger.debug("Detected %s for undeclared page encoding", best.encoding)
+            return body.decode(best.encoding, "replace")
+    # The HTML default for undeclared English-language pages
+    return body.decode("cp1252", "replace")
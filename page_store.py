@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Content-addressed archive of raw pages fetched by the clinic scrapers
+Bodies are split into content-defined chunks stored once per SHA-256 and compressed, so pages that
+share boilerplate or barely changed between runs share storage; each run keeps a URL -> hash index
+per clinic
+"""
+
+import gzip
+import zlib
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+from urllib.parse import urlsplit
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip is always available
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Chunk boundaries fall after a line whose CRC has these low bits clear, once MIN_CHUNK bytes have
+# accumulated, so an edit only changes the chunks around it (about 1 line in 32 ends a chunk)
+CHUNK_BOUNDARY_MASK = 0x1F
+MIN_CHUNK = 2 * 1024
+# Hard cap for pages without line breaks (minified HTML), which fall back to fixed-size chunks
+MAX_CHUNK = 64 * 1024
+
+
+def new_run_id() -> str:
+    """Timestamped identifier for one crawl run"""
+    return datetime.now().strftime("%Y%m%dT%H%M%S")
+
+
+def job_key(clinic_key: str, base_url: Optional[str] = None) -> str:
+    """Index name for one scrape job: the clinic key, plus the site when base_url overrides the default
+
+    Jobs for the same clinic against different sites (mirrors, simulators) share a run, so each
+    needs its own index.
+    """
+    if not base_url:
+        return clinic_key
+    parts = urlsplit(base_url)
+    site = re.sub(r"[^A-Za-z0-9.-]+", "_", f"{parts.netloc}{parts.path}".strip("/"))
+    return f"{clinic_key}@{site}"
+
+
+def clinic_key_of(job: str) -> str:
+    """Registered clinic key of a job index name"""
+    return job.partition("@")[0]
+
+
+def split_chunks(body: bytes) -> List[bytes]:
+    """Split a body into content-defined chunks at line boundaries"""
+    chunks, current, size = [], [], 0
+    for line in body.splitlines(keepends=True):
+        while len(line) > MAX_CHUNK - size:
+            cut = MAX_CHUNK - size
+            current.append(line[:cut])
+            chunks.append(b"".join(current))
+            current, size, line = [], 0, line[cut:]
+        current.append(line)
+        size += len(line)
+        if size >= MIN_CHUNK and not zlib.crc32(line) & CHUNK_BOUNDARY_MASK:
+            chunks.append(b"".join(current))
+            current, size = [], 0
+    if current:
+        chunks.append(b"".join(current))
+    return chunks
+
+
+class PageStore:
+    """On-disk store: objects/<hh>/<sha256>.{zst,gz} plus runs/<run_id>/<clinic>.jsonl indexes
+
+    A body that splits into several chunks is stored as objects/<hh>/<sha256>.chunks, a JSON list
+    of the chunk digests, with each chunk an object of its own.
+    """
+
+    def __init__(self, root: str = "page_store", compression: Optional[str] = None):
+        self.root = root
+        if compression is None:
+            compression = "zst" if zstandard is not None else "gz"
+        if compression == "zst" and zstandard is None:
+            raise ValueError("zstd compression requested but the zstandard package is not installed")
+        if compression not in ("zst", "gz"):
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.compression = compression
+        self._lock = threading.Lock()
+        self._indexed = set()
+
+    def _object_path(self, digest: str, compression: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.{compression}")
+
+    def _index_path(self, run_id: str, clinic: str) -> str:
+        return os.path.join(self.root, "runs", run_id, f"{clinic}.jsonl")
+
+    def _find_object(self, digest: str) -> Optional[str]:
+        for compression in ("zst", "gz", "chunks"):
+            path = self._object_path(digest, compression)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put(self, body: bytes) -> str:
+        """Store a body if it is not already present and return its SHA-256"""
+        digest = hashlib.sha256(body).hexdigest()
+        if self._find_object(digest):
+            return digest
+
+        chunks = split_chunks(body)
+        if len(chunks) <= 1:
+            self._write_object(digest, self.compression, self._compress(body))
+            return digest
+        # Chunks go in before the manifest so a reader never sees one that points at missing data
+        chunk_digests = [self._put_chunk(chunk) for chunk in chunks]
+        self._write_object(digest, "chunks", json.dumps(chunk_digests).encode("ascii"))
+        return digest
+
+    def _put_chunk(self, chunk: bytes) -> str:
+        digest = hashlib.sha256(chunk).hexdigest()
+        if not self._find_object(digest):
+            self._write_object(digest, self.compression, self._compress(chunk))
+        return digest
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == "zst":
+            return zstandard.ZstdCompressor(level=3).compress(data)
+        return gzip.compress(data, compresslevel=6, mtime=0)
+
+    def _write_object(self, digest: str, kind: str, data: bytes):
+        path = self._object_path(digest, kind)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file and rename so concurrent writers never expose a partial object
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, digest: str) -> bytes:
+        """Return the raw body stored under digest"""
+        path = self._find_object(digest)
+        if path is None:
+            raise KeyError(digest)
+        with open(path, "rb") as f:
+            data = f.read()
+        if path.endswith(".chunks"):
+            return b"".join(self.get(chunk) for chunk in json.loads(data))
+        if path.endswith(".zst"):
+            if zstandard is None:
+                raise RuntimeError(f"{path} is zstd-compressed but the zstandard package is not installed")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def save_page(self, run_id: str, clinic: str, url: str, body: bytes,
+                  content_type: Optional[str] = None, from_cache: bool = False,
+                  base_url: Optional[str] = None) -> str:
+        """Archive a fetched body and record it in the run's URL index
+
+        clinic is the job index name (see job_key); base_url is the site the job scraped, which
+        replay needs to rebuild the same URLs. from_cache marks a body reused from an earlier run
+        rather than fetched live.
+        """
+        digest = self.put(body)
+        key = (run_id, clinic, url)
+        with self._lock:
+            if key in self._indexed:
+                return digest
+            self._indexed.add(key)
+            entry = {
+                "url": url,
+                "sha256": digest,
+                "content_type": content_type,
+                "size": len(body),
+                "fetched_at": datetime.now().isoformat()
+            }
+            if base_url:
+                entry["base_url"] = base_url
+            if from_cache:
+                entry["from_cache"] = True
+            path = self._index_path(run_id, clinic)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        return digest
+
+    def load_index(self, run_id: str, clinic: str) -> Dict[str, Dict[str, Any]]:
+        """Return the URL -> index entry mapping for one clinic in one run"""
+        index = {}
+        path = self._index_path(run_id, clinic)
+        if not os.path.exists(path):
+            return index
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    index[entry["url"]] = entry
+        return index
+
+    def list_runs(self) -> List[str]:
+        """Run ids present in the store, oldest first"""
+        runs_dir = os.path.join(self.root, "runs")
+        if not os.path.isdir(runs_dir):
+            return []
+        return sorted(os.listdir(runs_dir))
+
+    def list_clinics(self, run_id: str) -> List[str]:
+        """Job index names (clinic keys, or clinic_key@site for base URL overrides) in a run"""
+        run_dir = os.path.join(self.root, "runs", run_id)
+        if not os.path.isdir(run_dir):
+            return []
+        return sorted(name[:-len(".jsonl")] for name in os.listdir(run_dir) if name.endswith(".jsonl"))
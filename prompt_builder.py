@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+System prompt builder for scraped clinic data
+Renders the CalmClinic system prompt (see system_prompt_sample.md) from a scraper output,
+caching by a hash of the sections the prompt uses so unchanged clinics are not re-rendered
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import logging
+from string import Template
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+from scraper_logging import configure_logging
+
+logger = logging.getLogger(__name__)
+
+# Bump when the templates change so every cached prompt is re-rendered
+TEMPLATE_VERSION = 1
+
+# Only these parts of a scraper output affect the prompt
+PROMPT_SECTIONS = ("contact_info", "hours_info", "provider_info", "services_info", "insurance_info", "patient_experience")
+
+# Templates are compiled once at import and reused for every clinic
+PROMPT_TEMPLATE = Template("""# CalmClinic System Prompt - $clinic_name
+
+## Clinic-Specific Information Assistant
+
+You are an AI assistant specifically trained to help patients interact with **$clinic_name**. Use the detailed clinic information below to provide accurate, personalized responses about this specific practice.
+
+### Core Clinic Information
+
+**Practice Name:** $clinic_name  
+$contact_lines
+
+**Hours:** $hours
+
+### Our Providers
+
+$providers
+
+### Services We Offer
+
+$services
+
+### Insurance & Payment Information
+
+$insurance
+
+### Appointment & Visit Information
+
+$visit_info
+
+### Response Guidelines
+
+When patients ask questions, provide specific information about $clinic_name rather than generic medical advice:
+
+**Instead of saying:** "Call your doctor..."
+**Say:** "Call our office at $main_phone..."
+
+### When to Escalate
+
+Direct patients to call $main_phone for:
+- Urgent medical concerns or emergencies
+- Insurance verification questions
+- Appointment scheduling or changes
+- Specific questions about procedures
+
+Remember: Your role is to provide helpful, clinic-specific information while always encouraging patients to contact the office directly for medical advice, emergencies, or detailed consultations.
+""")
+PROVIDER_TEMPLATE = Template("$number. **$name** - $title\n   - $specialty_label: $specialties")
+SUBSECTION_TEMPLATE = Template("**$heading:**\n$items")
+
+SERVICE_HEADINGS = [
+    ("medical_services", "Medical Services"),
+    ("surgical_services", "Surgical Services"),
+    ("optical_services", "Optical Services"),
+    ("specialty_programs", "Specialty Programs"),
+    ("diagnostic_services", "Diagnostic Testing"),
+    ("conditions_treated", "Conditions Treated"),
+]
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+def _bullets(items: Iterable[Any]) -> str:
+    return "\n".join(f"- {item}" for item in items)
+
+
+def _subsections(pairs: List[Tuple[str, List[Any]]]) -> str:
+    blocks = [SUBSECTION_TEMPLATE.substitute(heading=heading, items=_bullets(items)) for heading, items in pairs if items]
+    return "\n\n".join(blocks) if blocks else "_Not available_"
+
+
+def _label(key: str) -> str:
+    return key.replace("_", " ").title()
+
+
+def _policies(policies: Dict[str, Any]) -> List[str]:
+    lines = []
+    for key, value in policies.items():
+        if isinstance(value, bool):
+            value = "Yes" if value else "No"
+        lines.append(f"{_label(key)}: {value}")
+    return lines
+
+
+def _format_hours(regular_hours: Dict[str, str]) -> str:
+    """Collapse consecutive days with the same hours: 'Monday - Friday, 8:00 AM - 5:00 PM'"""
+    if not regular_hours:
+        return "Please call the office for current hours"
+    runs = []
+    for day in WEEKDAYS:
+        hours = regular_hours.get(day)
+        if hours is None:
+            continue
+        if runs and runs[-1][2] == hours and WEEKDAYS.index(runs[-1][1]) == WEEKDAYS.index(day) - 1:
+            runs[-1][1] = day
+        else:
+            runs.append([day, day, hours])
+    parts = []
+    for first, last, hours in runs:
+        days = first.title() if first == last else f"{first.title()} - {last.title()}"
+        parts.append(f"{days}, {hours}")
+    return "; ".join(parts)
+
+
+def prompt_inputs(clinic_data: Dict[str, Any]) -> Dict[str, Any]:
+    """The subset of a scraper output the prompt is rendered from"""
+    data = clinic_data.get("data", {})
+    return {
+        "clinic_name": clinic_data["clinic_name"],
+        "sections": {name: data.get(name) for name in PROMPT_SECTIONS},
+    }
+
+
+def inputs_hash(inputs: Dict[str, Any]) -> str:
+    canonical = json.dumps([TEMPLATE_VERSION, inputs], sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def render_prompt(inputs: Dict[str, Any]) -> str:
+    """Render the system prompt text from prompt_inputs()"""
+    sections = inputs["sections"]
+    contact = sections.get("contact_info") or {}
+    hours = sections.get("hours_info") or {}
+    services = sections.get("services_info") or {}
+    insurance = sections.get("insurance_info") or {}
+    experience = sections.get("patient_experience") or {}
+
+    phones = contact.get("phone_numbers") or {}
+    main_phone = phones.get("main") or next(iter(phones.values()), "the office")
+    contact_lines = []
+    address = (contact.get("address") or {}).get("full_address")
+    if address:
+        contact_lines.append(f"**Location:** {address}  ")
+    for label, number in phones.items():
+        name = "Main Phone" if label == "main" else _label(label)
+        contact_lines.append(f"**{name}:** {number}  ")
+    if contact.get("email"):
+        contact_lines.append(f"**Email:** {contact['email']}  ")
+    if contact.get("website"):
+        contact_lines.append(f"**Website:** {contact['website']}")
+
+    providers = "\n\n".join(
+        PROVIDER_TEMPLATE.substitute(
+            number=i,
+            name=provider["name"],
+            title=provider.get("title") or "Provider",
+            specialty_label="Specialties" if len(provider.get("specialties") or []) != 1 else "Specialty",
+            specialties=", ".join(provider.get("specialties") or []) or "General care",
+        )
+        for i, provider in enumerate(sections.get("provider_info") or [], start=1)
+    ) or "_Not available_"
+
+    insurance_text = _subsections([
+        ("Insurance Accepted", insurance.get("accepted_plans") or []),
+        ("Important Insurance Notes", insurance.get("special_notes") or []),
+        ("Payment Policies", _policies(insurance.get("payment_policies") or {})),
+    ])
+
+    visit_info = _subsections([
+        ("Scheduling", _policies(hours.get("appointment_policies") or {})),
+        ("What to Bring", experience.get("what_to_bring") or []),
+        ("Office Policies", experience.get("facility_policies") or []),
+        ("Communication", experience.get("communication_preferences") or []),
+    ])
+
+    return PROMPT_TEMPLATE.substitute(
+        clinic_name=inputs["clinic_name"],
+        contact_lines="\n".join(contact_lines),
+        hours=_format_hours(hours.get("regular_hours") or {}),
+        providers=providers,
+        services=_subsections([(heading, services.get(field) or []) for field, heading in SERVICE_HEADINGS]),
+        insurance=insurance_text,
+        visit_info=visit_info,
+        main_phone=main_phone,
+    )
+
+
+def clinic_slug(clinic_name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", clinic_name.lower()).strip("-")
+
+
+class PromptBuilder:
+    """Renders prompts into output_dir, skipping clinics whose prompt inputs are unchanged"""
+
+    def __init__(self, output_dir: str = "prompts"):
+        self.output_dir = output_dir
+        self.manifest_path = os.path.join(output_dir, "manifest.json")
+        self.manifest: Dict[str, str] = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+
+    def build(self, clinic_data: Dict[str, Any], slug: Optional[str] = None) -> Tuple[str, bool]:
+        """Return the prompt path for one clinic and whether it was re-rendered"""
+        slug = slug or clinic_slug(clinic_data["clinic_name"])
+        path = os.path.join(self.output_dir, f"{slug}.md")
+        inputs = prompt_inputs(clinic_data)
+        digest = inputs_hash(inputs)
+        if self.manifest.get(slug) == digest and os.path.exists(path):
+            return path, False
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(render_prompt(inputs))
+        self.manifest[slug] = digest
+        return path, True
+
+    def build_batch(self, jsonl_path: str) -> Dict[str, int]:
+        """Render prompts for every scraper output (one JSON object per line) in a fleet file"""
+        counts = {"rendered": 0, "unchanged": 0}
+        with open(jsonl_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                clinic_data = json.loads(line)
+                slug = clinic_slug(clinic_data["clinic_name"])
+                if clinic_data.get("base_url"):
+                    # Same-clinic jobs against different sites must not overwrite each other
+                    slug = f"{slug}-{clinic_slug(clinic_data['base_url'].split('://')[-1])}"
+                _, rendered = self.build(clinic_data, slug)
+                counts["rendered" if rendered else "unchanged"] += 1
+        self.save_manifest()
+        return counts
+
+    def save_manifest(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    """Main execution function"""
+    parser = argparse.ArgumentParser(prog=prog, description="Render CalmClinic system prompts from scraper output")
+    parser.add_argument("inputs", nargs="+", help="Scraper output .json files or fleet .jsonl files")
+    parser.add_argument("--output-dir", default="prompts", help="Directory for rendered prompts")
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    builder = PromptBuilder(args.output_dir)
+    counts = {"rendered": 0, "unchanged": 0}
+    for path in args.inputs:
+        if path.endswith(".jsonl"):
+            for key, value in builder.build_batch(path).items():
+                counts[key] += value
+        else:
+            with open(path, encoding="utf-8") as f:
+                _, rendered = builder.build(json.load(f))
+            counts["rendered" if rendered else "unchanged"] += 1
+    builder.save_manifest()
+
+    print(f"Prompts rendered: {counts['rendered']}, unchanged: {counts['unchanged']} -> {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
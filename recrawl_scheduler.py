@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Adaptive recrawl scheduler for clinic pages
+Estimates each URL's change rate from observed content changes across runs and spreads up to a
+global daily fetch budget so fast-changing pages are checked often and static ones rarely
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import math
+import os
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+
+from page_store import PageStore
+from scraper_logging import configure_logging
+
+logger = logging.getLogger(__name__)
+
+DAY = 86400.0
+# Gamma prior on the change rate: roughly "one change per PRIOR_DAYS" until data says otherwise
+PRIOR_CHANGES = 0.5
+PRIOR_DAYS = 7.0
+# Fractional rate increase per greedy planning step
+RATE_STEP = 0.25
+# Interval for a page seen for the first time, until the next plan() places it
+INITIAL_INTERVAL_DAYS = 1.0
+# Expected share of time a page's copy is current beyond which extra fetches are not worth making
+TARGET_FRESHNESS = 0.95
+
+
+def expected_freshness(rate: float, interval_days: float) -> float:
+    """Fraction of time a copy refreshed every interval_days is up to date (Poisson changes)"""
+    x = rate * interval_days
+    if x < 1e-9:
+        return 1.0
+    return (1.0 - math.exp(-x)) / x
+
+
+class RecrawlScheduler:
+    """Per-URL change tracking and fetch planning, persisted as JSON between runs"""
+
+    def __init__(self, state_path: str = "recrawl_state.json", budget_per_day: float = 100.0,
+                 min_interval_hours: float = 1.0, max_interval_days: float = 30.0,
+                 target_freshness: float = TARGET_FRESHNESS):
+        self.state_path = state_path
+        self.budget_per_day = budget_per_day
+        self.target_freshness = target_freshness
+        self.min_interval_days = min_interval_hours / 24.0
+        self.max_interval_days = max_interval_days
+        self._lock = threading.Lock()
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(state_path):
+            with open(state_path, encoding="utf-8") as f:
+                self.pages = json.load(f)
+
+    def change_rate(self, url: str) -> float:
+        """Estimated changes per day for url"""
+        page = self.pages.get(url)
+        if page is None:
+            return PRIOR_CHANGES / PRIOR_DAYS
+        return (page["changes"] + PRIOR_CHANGES) / (page["observed_seconds"] / DAY + PRIOR_DAYS)
+
+    def is_due(self, url: str, now: Optional[float] = None) -> bool:
+        """Whether url should be fetched live now (unknown URLs always are)"""
+        now = now or time.time()
+        with self._lock:
+            page = self.pages.get(url)
+            return page is None or now >= page["next_fetch"]
+
+    def cached_copy(self, url: str) -> Optional[Tuple[str, Optional[str]]]:
+        """SHA-256 and Content-Type of the last body seen for url"""
+        with self._lock:
+            page = self.pages.get(url)
+            return (page["last_hash"], page.get("content_type")) if page else None
+
+    def observe(self, url: str, body: Optional[bytes] = None, digest: Optional[str] = None,
+                now: Optional[float] = None, content_type: Optional[str] = None):
+        """Record a live fetch of url and whether its content changed since the last one
+
+        content_type is kept with the hash so a cached copy decodes with the charset it was served with.
+        """
+        now = now or time.time()
+        digest = digest or hashlib.sha256(body).hexdigest()
+        with self._lock:
+            page = self.pages.get(url)
+            if page is None:
+                page = {"changes": 0, "observed_seconds": 0.0, "last_fetch": now, "last_hash": digest,
+                        "content_type": content_type, "interval_days": INITIAL_INTERVAL_DAYS}
+                self.pages[url] = page
+            elif now > page["last_fetch"]:
+                page["observed_seconds"] += now - page["last_fetch"]
+                if digest != page["last_hash"]:
+                    page["changes"] += 1
+                page["last_fetch"] = now
+                page["last_hash"] = digest
+                page["content_type"] = content_type
+            page["next_fetch"] = page["last_fetch"] + page["interval_days"] * DAY
+
+    def plan(self) -> Dict[str, float]:
+        """Assign each URL a fetch interval within the daily budget and return url -> interval in days
+
+        Every page gets at least one fetch per max_interval_days; further fetches are handed out in
+        small rate increases to whichever page gains the most expected freshness per extra fetch.
+        A page stops receiving them once its expected freshness reaches target_freshness, so the
+        budget is a ceiling rather than a quota and static pages keep long intervals.
+        """
+        with self._lock:
+            urls = list(self.pages)
+            if not urls:
+                return {}
+            rates = {url: self.change_rate(url) for url in urls}
+            base = 1.0 / self.max_interval_days
+            max_rate = 1.0 / self.min_interval_days
+            fetch_rates = {url: base for url in urls}
+            remaining = self.budget_per_day - base * len(urls)
+            if remaining < 0:
+                logger.warning("Budget of %s/day cannot cover %d pages at the minimum rate", self.budget_per_day, len(urls))
+
+            def step_for(url: str) -> float:
+                current = fetch_rates[url]
+                return min(current * RATE_STEP, max_rate - current)
+
+            def gain(url: str) -> float:
+                current, step = fetch_rates[url], step_for(url)
+                if step <= 0 or expected_freshness(rates[url], 1.0 / current) >= self.target_freshness:
+                    return 0.0
+                return (expected_freshness(rates[url], 1.0 / (current + step))
+                        - expected_freshness(rates[url], 1.0 / current)) / step
+
+            heap = [(-gain(url), url) for url in urls]
+            heapq.heapify(heap)
+            while remaining > 0 and heap:
+                negative_gain, url = heapq.heappop(heap)
+                if negative_gain >= 0:
+                    break
+                step = min(step_for(url), remaining)
+                fetch_rates[url] += step
+                remaining -= step
+                heapq.heappush(heap, (-gain(url), url))
+
+            intervals = {}
+            for url in urls:
+                interval = 1.0 / fetch_rates[url]
+                page = self.pages[url]
+                page["interval_days"] = interval
+                page["next_fetch"] = page["last_fetch"] + interval * DAY
+                intervals[url] = interval
+            return intervals
+
+    def due_urls(self, now: Optional[float] = None) -> List[str]:
+        """URLs due for a live fetch, most overdue first"""
+        now = now or time.time()
+        with self._lock:
+            due = [(page["next_fetch"], url) for url, page in self.pages.items() if now >= page["next_fetch"]]
+        return [url for _, url in sorted(due)]
+
+    def seed_from_store(self, store: PageStore):
+        """Replay every archived run in order to build change history"""
+        for run_id in store.list_runs():
+            for clinic_key in store.list_clinics(run_id):
+                for url, entry in store.load_index(run_id, clinic_key).items():
+                    if entry.get("from_cache"):
+                        # Served from an earlier copy, so it says nothing about change
+                        continue
+                    fetched_at = datetime.fromisoformat(entry["fetched_at"]).timestamp()
+                    self.observe(url, digest=entry["sha256"], now=fetched_at, content_type=entry.get("content_type"))
+
+    def save(self):
+        with self._lock:
+            tmp_path = self.state_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.pages, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.state_path)
+
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Plan page recrawls from observed change rates")
+    parser.add_argument("--state", default="recrawl_state.json", help="Scheduler state file")
+    parser.add_argument("--budget", type=float, default=100.0, help="Most page fetches per day")
+    parser.add_argument("--target-freshness", type=float, default=TARGET_FRESHNESS,
+                        help="Stop adding fetches to a page once its copy is expected to be current this share of the time")
+    parser.add_argument("--seed-from-store", metavar="STORE", help="Build history from a page store first")
+    args = parser.parse_args()
+
+    scheduler = RecrawlScheduler(args.state, budget_per_day=args.budget, target_freshness=args.target_freshness)
+    if args.seed_from_store:
+        scheduler.seed_from_store(PageStore(args.seed_from_store))
+    intervals = scheduler.plan()
+    scheduler.save()
+
+    print(f"\n=== RECRAWL PLAN ===")
+    print(f"Pages: {len(intervals)}  Budget: {args.budget:g}/day  Planned: {sum(1 / i for i in intervals.values()):.1f}/day")
+    for url, interval in sorted(intervals.items(), key=lambda item: item[1])[:20]:
+        print(f"  every {interval * 24:7.1f}h  {scheduler.change_rate(url):.3f} changes/day  {url}")
+    print(f"Due now: {len(scheduler.due_urls())}")
+
+
+if __name__ == "__main__":
+    configure_logging()
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Re-extraction over archived pages
+Replays the clinic scrapers' extractors against a stored run, with no network traffic,
+and diffs the fresh output against the previously saved JSON
+"""
+
+import argparse
+import json
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
+
+from page_store import PageStore, clinic_key_of
+from scraper_registry import get_scraper_class
+from scraper_logging import configure_logging, configure_worker_logging
+
+logger = logging.getLogger(__name__)
+
+# Top-level keys that change on every run and say nothing about the extracted data
+IGNORED_KEYS = {"extraction_timestamp"}
+
+
+def output_path(output_dir: str, clinic_key: str) -> str:
+    """Path of a clinic's (or job's) JSON output, matching the scrapers' save_to_json default"""
+    return os.path.join(output_dir, f"{clinic_key}_data.json")
+
+
+def report_path(output_dir: str, run_id: str) -> str:
+    """Path of the diff report for one re-extracted run"""
+    return os.path.join(output_dir, f"reextract_diff_{run_id}.json")
+
+
+def staged_path(path: str) -> str:
+    """Where a re-extracted output waits until the diff report against the old one is saved"""
+    return f"{path}.new"
+
+
+def diff_outputs(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """List the changes between two scraper outputs
+
+    Lists of plain values are compared as sets because the extractors dedupe through set().
+    """
+    changes = []
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in sorted(set(old) | set(new)):
+            if not path and key in IGNORED_KEYS:
+                continue
+            sub_path = f"{path}.{key}" if path else key
+            if key not in old:
+                changes.append({"path": sub_path, "added": new[key]})
+            elif key not in new:
+                changes.append({"path": sub_path, "removed": old[key]})
+            else:
+                changes.extend(diff_outputs(old[key], new[key], sub_path))
+    elif isinstance(old, list) and isinstance(new, list):
+        if all(not isinstance(item, (dict, list)) for item in old + new):
+            added = [item for item in new if item not in old]
+            removed = [item for item in old if item not in new]
+            if added or removed:
+                changes.append({"path": path, "added": added, "removed": removed})
+        elif len(old) == len(new):
+            for i, (old_item, new_item) in enumerate(zip(old, new)):
+                changes.extend(diff_outputs(old_item, new_item, f"{path}[{i}]"))
+        else:
+            changes.append({"path": path, "old": old, "new": new})
+    elif old != new:
+        changes.append({"path": path, "old": old, "new": new})
+    return changes
+
+
+def reextract_clinic(job: str, store_root: str, run_id: str, output_dir: str) -> Tuple[str, Dict[str, Any]]:
+    """Replay one job's extractors over an archived run and stage the result
+
+    job is a run index name (see page_store.job_key). Returns it with a summary holding the
+    diff against the previous output. The new output is written next to the previous one as
+    <output>.new and only replaces it once the fleet's diff report is saved.
+    """
+    store = PageStore(store_root)
+    clinic_key = clinic_key_of(job)
+    base_url = None
+    if job != clinic_key:
+        # The job scraped an overridden site; its archived URLs are under that base URL
+        index = store.load_index(run_id, job)
+        base_url = next((entry.get("base_url") for entry in index.values() if entry.get("base_url")), None)
+    scraper = get_scraper_class(clinic_key)(page_store=store, replay_run_id=run_id, base_url=base_url)
+    if not scraper.replay_index:
+        raise ValueError(f"Run {run_id} has no archived pages for {job}")
+
+    clinic_data = scraper.scrape_all_data()
+
+    path = output_path(output_dir, job)
+    previous = None
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            previous = json.load(f)
+
+    scraper.save_to_json(staged_path(path))
+    return job, {
+        "ok": True,
+        "error": None,
+        "output": path,
+        "previous_output_found": previous is not None,
+        "changes": diff_outputs(previous, clinic_data) if previous is not None else []
+    }
+
+
+def reextract_fleet(store_root: str, run_id: Optional[str] = None, clinics: Optional[List[str]] = None,
+                    output_dir: str = ".", workers: Optional[int] = None) -> Dict[str, Any]:
+    """Re-extract every requested job (default: all) from one archived run in parallel
+
+    A failing job is recorded in the report instead of aborting the fleet. The report is saved
+    as reextract_diff_<run_id>.json before any output is replaced, so a crash part-way never
+    leaves new outputs without the diff against the ones they overwrote.
+    """
+    store = PageStore(store_root)
+    if run_id is None:
+        runs = store.list_runs()
+        if not runs:
+            raise ValueError(f"No archived runs in {store_root}")
+        run_id = runs[-1]
+    clinics = clinics or store.list_clinics(run_id)
+    os.makedirs(output_dir, exist_ok=True)
+
+    logger.info("Re-extracting %d clinic(s) from run %s", len(clinics), run_id)
+    results = {}
+    # Import the scraper modules (requests, bs4) once here so forked workers inherit them
+    for job in clinics:
+        try:
+            get_scraper_class(clinic_key_of(job))
+        except KeyError:
+            pass  # reported for that job when its worker hits the same error
+    # Workers only log if this process does, at the same level
+    root = logging.getLogger()
+    initializer = configure_worker_logging if root.handlers else None
+    # Extraction is parse-bound, so spread clinics across processes
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=(root.level,)) as pool:
+        futures = {job: pool.submit(reextract_clinic, job, store_root, run_id, output_dir) for job in clinics}
+        for job, future in futures.items():
+            try:
+                _, results[job] = future.result()
+            except Exception as e:
+                logger.error("Re-extracting %s failed: %s", job, e)
+                results[job] = {"ok": False, "error": str(e), "output": None,
+                                "previous_output_found": False, "changes": []}
+
+    report = {"run_id": run_id, "clinics": results}
+    with open(report_path(output_dir, run_id), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    for summary in results.values():
+        if summary["ok"]:
+            os.replace(staged_path(summary["output"]), summary["output"])
+    return report
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    """Main execution function"""
+    parser = argparse.ArgumentParser(prog=prog, description="Re-run clinic extractors over archived pages")
+    parser.add_argument("--store", default="page_store", help="Page store directory")
+    parser.add_argument("--run", dest="run_id", help="Archived run id (default: latest)")
+    parser.add_argument("--clinic", action="append", dest="clinics",
+                        help="Clinic key or clinic_key@site job, repeatable (default: all in run)")
+    parser.add_argument("--output-dir", default=".", help="Directory for JSON outputs and the diff report")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    report = reextract_fleet(args.store, args.run_id, args.clinics, args.output_dir, args.workers)
+
+    print(f"\n=== RE-EXTRACTION SUMMARY ===")
+    print(f"Run: {report['run_id']}")
+    for job, summary in report["clinics"].items():
+        if summary["ok"]:
+            print(f"{job}: {len(summary['changes'])} change(s) -> {summary['output']}")
+        else:
+            print(f"{job}: FAILED - {summary['error']}")
+    print(f"Diff report: {report_path(args.output_dir, report['run_id'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Logging setup for the clinic scraper entry points
+Records are handed to a queue on the calling thread and formatted as JSON lines by a background
+listener, so concurrent fetches never wait on handler locks or message formatting
+"""
+
+import atexit
+import itertools
+import json
+import os
+import queue
+import sys
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Any, TextIO
+
+# Fields copied from a record (set through log_context or extra=) into its JSON line
+STRUCTURED_FIELDS = ("clinic_key", "run_id", "url", "attempt")
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_context: ContextVar[Dict[str, Any]] = ContextVar("scraper_log_context", default={})
+_installed: Dict[str, Any] = {}
+
+
+@contextmanager
+def log_context(**fields):
+    """Attach fields such as clinic_key to every record logged in this context (thread or task)"""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copy the current log_context onto each record before it leaves the calling thread"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep one in every N records tagged with extra={"sample": key}
+
+    rates maps a sample key to the fraction of its records to keep; untagged records always pass.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.every = {key: (round(1 / rate) if rate > 0 else 0) for key, rate in rates.items()}
+        # next() on itertools.count is atomic under the GIL, so no lock is needed
+        self._counters = {key: itertools.count() for key in rates}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample", None)
+        every = self.every.get(key)
+        if every is None:
+            return True
+        if every == 0:
+            return False
+        return next(self._counters[key]) % every == 0
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread
+
+    The stock prepare() formats the message on the calling thread so records can be pickled;
+    the queue here never leaves the process, so the record is passed through untouched.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record: timestamp, level, logger, message and structured fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key in STRUCTURED_FIELDS:
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(level: int = logging.INFO, json_lines: bool = True, stream: Optional[TextIO] = None,
+                      sample_rates: Optional[Dict[str, float]] = None) -> QueueListener:
+    """Route root logging through a background queue listener; call once from an entry point
+
+    Calling it again (e.g. in a forked worker process) replaces the previous setup.
+    """
+    root = logging.getLogger()
+    previous = _installed.pop("handler", None)
+    if previous is not None:
+        root.removeHandler(previous)
+        _stop_listener()
+
+    target = logging.StreamHandler(stream or sys.stderr)
+    target.setFormatter(JsonLinesFormatter() if json_lines else logging.Formatter(TEXT_FORMAT))
+
+    records = queue.SimpleQueue()
+    handler = DeferredQueueHandler(records)
+    handler.addFilter(SamplingFilter(sample_rates or {}))
+    handler.addFilter(ContextFilter())
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    listener = QueueListener(records, target)
+    listener.start()
+    if "pid" not in _installed:
+        atexit.register(_stop_listener)
+    _installed.update(handler=handler, listener=listener, pid=os.getpid())
+    return listener
+
+
+def configure_worker_logging(level: int = logging.INFO, json_lines: bool = True):
+    """Process pool initializer: give each worker its own listener, flushed when the worker exits
+
+    Pool workers leave through os._exit, which skips atexit, so the flush is registered as a
+    multiprocessing finalizer instead.
+    """
+    import multiprocessing.util  # only pool workers need it, keep it off the CLI start-up path
+
+    configure_logging(level, json_lines)
+    multiprocessing.util.Finalize(None, _stop_listener, exitpriority=0)
+
+
+def _stop_listener():
+    # Flush queued records; a forked child inherits the listener object but not its thread
+    listener = _installed.pop("listener", None)
+    if listener is not None and _installed["pid"] == os.getpid():
+        listener.stop()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Registry of clinic scraper classes by clinic key
+Entries are import paths so looking one up does not import requests/bs4 for every clinic
+"""
+
+import importlib
+from typing import Dict, List
+
+SCRAPERS: Dict[str, str] = {
+    "fort_worth_ent": "fort_worth_ent_scraper:FortWorthENTScraper",
+    "fort_worth_eye": "fort_worth_eye_scraper:FortWorthEyeScraper",
+}
+
+
+def clinic_keys() -> List[str]:
+    """All registered clinic keys"""
+    return sorted(SCRAPERS)
+
+
+def get_scraper_class(clinic_key: str):
+    """Import and return the scraper class registered for clinic_key"""
+    try:
+        target = SCRAPERS[clinic_key]
+    except KeyError:
+        raise KeyError(f"Unknown clinic '{clinic_key}'. Known clinics: {', '.join(clinic_keys())}") from None
+    module_name, class_name = target.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Local multi-site HTTP simulator for load testing the clinic scrapers
+Hosts many synthetic (or archived) clinic sites on local ports with configurable latency,
+errors, 429s and slow bodies, and drives the batch scraper against them
+"""
+
+import argparse
+import random
+import threading
+import time
+import logging
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Any, Tuple
+from urllib.parse import urlsplit
+
+from page_store import PageStore, clinic_key_of
+from scraper_logging import configure_logging
+
+logger = logging.getLogger(__name__)
+
+# Terms the extractors look for, sprinkled into synthetic pages
+VOCABULARY = [
+    "balloon sinuplasty", "septoplasty", "turbinate reduction", "tonsillectomy", "thyroidectomy",
+    "allergy testing", "hearing evaluation", "nasal endoscopy", "sleep study", "laryngoscopy",
+    "sinusitis", "sleep apnea", "hearing loss", "tinnitus", "vertigo", "nasal polyps",
+    "aetna", "blue cross", "cigna", "united", "medicare", "medicaid",
+    "cataracts", "glaucoma", "dry eye", "macular degeneration", "new patient", "forms", "portal",
+]
+FILLER = ("Our team is committed to providing compassionate, comprehensive care for every patient "
+          "who walks through our doors. ")
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{name} - {path}</title>
+<script>window.analytics = {{"site": "{name}"}};</script></head>
+<body>
+<nav><a href="/">Home</a> <a href="/contact-us/">Contact</a> <a href="/patient-information/">Patients</a></nav>
+<h1>{name}</h1>
+<p>Call us at {phone} or {phone_alt}. Visit us at 5000 Collinwood Avenue.</p>
+<p>Hours: Monday - Friday 8:00 AM - 5:00 PM. Monday – Friday: 8 AM – 5 PM</p>
+<p>Email: office@{slug}.example</p>
+<ul>{terms}</ul>
+<p>{filler}</p>
+<footer><a href="https://www.facebook.com/{slug}/">Facebook</a>
+<a href="https://www.linkedin.com/company/{slug}/">LinkedIn</a></footer>
+</body></html>
+"""
+
+
+class FaultProfile:
+    """Fault injection settings for one simulated site"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, slow_body_rate: float = 0.0, slow_body_bps: int = 8192,
+                 down: bool = False):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.slow_body_rate = slow_body_rate
+        self.slow_body_bps = slow_body_bps
+        self.down = down
+
+
+class SimulatedSite:
+    """Pages for one clinic: fixed bodies by path, or synthetic pages for any path"""
+
+    def __init__(self, name: str, profile: Optional[FaultProfile] = None,
+                 pages: Optional[Dict[str, Tuple[bytes, str]]] = None, seed: int = 0, filler_repeat: int = 40):
+        self.name = name
+        self.profile = profile or FaultProfile()
+        self.pages = pages
+        self.seed = seed
+        self.filler_repeat = filler_repeat
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.status_counts = Counter()
+        self._synthetic_cache: Dict[str, bytes] = {}
+
+    @classmethod
+    def from_page_store(cls, store: PageStore, run_id: str, clinic_key: str,
+                        profile: Optional[FaultProfile] = None, seed: int = 0) -> "SimulatedSite":
+        """Serve the pages archived for a clinic (or job index) in a stored run, keyed by URL path"""
+        pages = {}
+        for url, entry in store.load_index(run_id, clinic_key).items():
+            path = urlsplit(url).path or "/"
+            pages[path] = (store.get(entry["sha256"]), entry.get("content_type") or "text/html; charset=utf-8")
+        return cls(clinic_key, profile, pages, seed)
+
+    def page(self, path: str) -> Optional[Tuple[bytes, str]]:
+        if self.pages is not None:
+            return self.pages.get(path) or self.pages.get(path.rstrip("/")) or self.pages.get(path + "/")
+        with self.lock:
+            body = self._synthetic_cache.get(path)
+            if body is None:
+                body = self._render(path)
+                self._synthetic_cache[path] = body
+        return body, "text/html; charset=utf-8"
+
+    def _render(self, path: str) -> bytes:
+        rng = random.Random(f"{self.seed}:{path}")
+        slug = self.name.lower().replace(" ", "-")
+        terms = rng.sample(VOCABULARY, k=rng.randint(3, 10))
+        return PAGE_TEMPLATE.format(
+            name=self.name, path=path, slug=slug,
+            phone=f"817-555-{self.seed % 10000:04d}", phone_alt=f"817-556-{rng.randint(0, 9999):04d}",
+            terms="".join(f"<li>{term.title()}</li>" for term in terms),
+            filler=FILLER * self.filler_repeat,
+        ).encode("utf-8")
+
+    def roll(self) -> float:
+        with self.lock:
+            return self.rng.random()
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        site: SimulatedSite = self.server.site
+        profile = site.profile
+
+        delay = profile.latency + (site.roll() * profile.jitter if profile.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+
+        roll = site.roll()
+        if roll < profile.error_rate:
+            return self._respond(site, 500, b"Internal Server Error", "text/plain")
+        if roll < profile.error_rate + profile.throttle_rate:
+            return self._respond(site, 429, b"Too Many Requests", "text/plain", {"Retry-After": "1"})
+
+        page = site.page(urlsplit(self.path).path or "/")
+        if page is None:
+            return self._respond(site, 404, b"Not Found", "text/plain")
+        body, content_type = page
+        self._respond(site, 200, body, content_type, slow=site.roll() < profile.slow_body_rate)
+
+    def _respond(self, site: SimulatedSite, status: int, body: bytes, content_type: str,
+                 headers: Optional[Dict[str, str]] = None, slow: bool = False):
+        with site.lock:
+            site.status_counts[status] += 1
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            if not slow:
+                self.wfile.write(body)
+                return
+            # Trickle the body out in tenth-of-a-second slices
+            step = max(1, site.profile.slow_body_bps // 10)
+            for start in range(0, len(body), step):
+                self.wfile.write(body[start:start + step])
+                self.wfile.flush()
+                time.sleep(0.1)
+        except (BrokenPipeError, ConnectionResetError):
+            # Clients hang up early on bodies past their size limit and on losing hedged requests
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SiteSimulator:
+    """Runs one local HTTP server per site so each has its own host:port (and circuit breaker)"""
+
+    def __init__(self, host: str = "127.0.0.1"):
+        self.host = host
+        self.sites: List[SimulatedSite] = []
+        self.base_urls: List[str] = []
+        self._servers: List[ThreadingHTTPServer] = []
+        self._threads: List[threading.Thread] = []
+
+    def add_site(self, site: SimulatedSite) -> str:
+        """Start serving a site and return its base URL"""
+        server = ThreadingHTTPServer((self.host, 0), _SiteHandler)
+        server.daemon_threads = True
+        server.site = site
+        base_url = f"http://{self.host}:{server.server_address[1]}"
+        if site.profile.down:
+            # Release the port so connections are refused, like a dead host
+            server.server_close()
+        else:
+            thread = threading.Thread(target=server.serve_forever, name=f"site-{site.name}", daemon=True)
+            thread.start()
+            self._servers.append(server)
+            self._threads.append(thread)
+        self.sites.append(site)
+        self.base_urls.append(base_url)
+        return base_url
+
+    def status_counts(self) -> Counter:
+        total = Counter()
+        for site in self.sites:
+            total.update(site.status_counts)
+        return total
+
+    def stop(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def run_load_test(sites: int = 100, workers: int = 16, profile: Optional[FaultProfile] = None,
+                  down_rate: float = 0.0, clinic_keys: Tuple[str, ...] = ("fort_worth_ent", "fort_worth_eye"),
+                  time_budget: Optional[float] = None, store: Optional[PageStore] = None,
+                  run_id: Optional[str] = None, seed: int = 0,
+                  hedge_percentile: Optional[float] = None) -> Dict[str, Any]:
+    """Drive the batch scraper against simulated sites and summarise throughput and failures"""
+    # Imported here so the simulator itself runs without the scraper dependencies
+    from batch_scrape import run_batch
+    from circuit_breaker import HostCircuitBreakers
+    from fetch_budget import LatencyTracker
+
+    profile = profile or FaultProfile()
+    rng = random.Random(seed)
+    jobs = []
+    replaying = store is not None and run_id is not None
+    # A stored run may hold several jobs per clinic (clinic_key@site), so replay every indexed job
+    sources = store.list_clinics(run_id) if replaying else list(clinic_keys)
+    if not sources:
+        raise ValueError(f"Run {run_id} has no archived pages")
+    with SiteSimulator() as simulator:
+        for i in range(sites):
+            source = sources[i % len(sources)]
+            clinic_key = clinic_key_of(source)
+            site_profile = FaultProfile(**vars(profile))
+            site_profile.down = rng.random() < down_rate
+            if replaying:
+                site = SimulatedSite.from_page_store(store, run_id, source, site_profile, seed=i)
+            else:
+                site = SimulatedSite(f"Clinic {i}", site_profile, seed=i)
+            jobs.append({"clinic_key": clinic_key, "base_url": simulator.add_site(site)})
+
+        started = time.monotonic()
+        # Fresh breakers/latency so one load test does not leak state into the next
+        results = run_batch(jobs, workers, breakers=HostCircuitBreakers(), latency=LatencyTracker(),
+                            time_budget=time_budget, hedge_percentile=hedge_percentile)
+        elapsed = time.monotonic() - started
+        statuses = simulator.status_counts()
+
+    clinic_seconds = [r["seconds"] for r in results]
+    partial = sum(
+        1 for r in results
+        if r["ok"] and any(gap.startswith("Partial data") for gap in r["clinic_data"]["identified_gaps"])
+    )
+    return {
+        "clinics": len(results),
+        "down_sites": sum(1 for s in simulator.sites if s.profile.down),
+        "elapsed_seconds": round(elapsed, 3),
+        "clinics_per_second": round(len(results) / elapsed, 3) if elapsed else 0.0,
+        "requests_served": sum(statuses.values()),
+        "status_counts": dict(statuses),
+        "p50_clinic_seconds": round(percentile(clinic_seconds, 50), 3),
+        "p99_clinic_seconds": round(percentile(clinic_seconds, 99), 3),
+        "max_clinic_seconds": round(max(clinic_seconds, default=0.0), 3),
+        "failed_clinics": sum(1 for r in results if not r["ok"]),
+        "partial_clinics": partial,
+    }
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    """Main execution function"""
+    parser = argparse.ArgumentParser(prog=prog, description="Load test the clinic scrapers against simulated sites")
+    parser.add_argument("--sites", type=int, default=100, help="Number of simulated clinic sites")
+    parser.add_argument("--workers", type=int, default=16, help="Concurrent clinics in the batch")
+    parser.add_argument("--latency", type=float, default=0.05, help="Base response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Extra random latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Fraction of 500 responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.01, help="Fraction of 429 responses")
+    parser.add_argument("--slow-rate", type=float, default=0.01, help="Fraction of slowly trickled bodies")
+    parser.add_argument("--down-rate", type=float, default=0.02, help="Fraction of sites refusing connections")
+    parser.add_argument("--time-budget", type=float, default=None, help="Seconds allowed per clinic")
+    parser.add_argument("--hedge-percentile", type=float, default=None,
+                        help="Send a backup request once a fetch is slower than this latency percentile")
+    parser.add_argument("--store", default=None, help="Serve archived pages from this page store")
+    parser.add_argument("--run", dest="run_id", default=None, help="Archived run id to serve")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for fault placement")
+    args = parser.parse_args(argv)
+    configure_logging(logging.WARNING)
+
+    profile = FaultProfile(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                           throttle_rate=args.throttle_rate, slow_body_rate=args.slow_rate)
+    store = PageStore(args.store) if args.store else None
+    run_id = args.run_id or (store.list_runs()[-1] if store and store.list_runs() else None)
+
+    report = run_load_test(args.sites, args.workers, profile, args.down_rate,
+                           time_budget=args.time_budget, store=store, run_id=run_id, seed=args.seed,
+                           hedge_percentile=args.hedge_percentile)
+
+    print(f"\n=== LOAD TEST SUMMARY ===")
+    for key, value in report.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()